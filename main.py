@@ -3,28 +3,35 @@ Main module for the Sales Analytics System.
 Orchestrates data reading, cleaning, API integration, analysis, and report generation.
 """
 
-import os
 import sys
-from utils.file_handler import read_sales_data
+from collections import Counter
+from utils.cache import load_or_parse
 from utils.data_processor import (
-    parse_transactions,
+    build_columns,
+    scan_and_validate,
+    apply_filters,
+    build_filter_summary,
     validate_and_filter,
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    customer_analysis,
-    daily_sales_trend,
+    calculate_total_revenue_arr,
+    region_wise_sales_arr,
+    top_selling_products_arr,
+    customer_analysis_arr,
+    daily_sales_trend_arr,
     find_peak_sales_day,
-    low_performing_products,
+    low_performing_products_arr,
     generate_sales_report
 )
 from utils.api_handler import (
     fetch_all_products,
     create_product_mapping,
-    enrich_sales_data
+    enrich_sales_data,
+    save_enriched_data
 )
 
 
+_BANNER_RULE = "=" * 40
+
+
 def main():
     """
     Main execution function
@@ -54,19 +61,19 @@ def main():
     """
     try:
         # Welcome message
-        print("=" * 40)
+        print(_BANNER_RULE)
         print("SALES ANALYTICS SYSTEM")
-        print("=" * 40)
+        print(_BANNER_RULE)
         print()
         
-        # Step 1: Read sales data file
+        # Step 1: Read sales data file (parsed result is cached while the file is unchanged)
         print("[1/10] Reading sales data...")
         try:
-            raw_lines = read_sales_data('data/sales_data.txt')
-            if not raw_lines:
+            line_count, transactions, columns = load_or_parse('data/sales_data.txt')
+            if not line_count:
                 print("✗ Error: No data read from file")
                 return
-            print(f"✓ Successfully read {len(raw_lines)} transactions")
+            print(f"✓ Successfully read {line_count} transactions")
         except Exception as e:
             print(f"✗ Error reading sales data: {str(e)}")
             return
@@ -74,37 +81,29 @@ def main():
         
         # Step 2: Parse and clean transactions
         print("[2/10] Parsing and cleaning data...")
-        try:
-            transactions = parse_transactions(raw_lines)
-            if not transactions:
-                print("✗ Error: No transactions parsed")
-                return
-            print(f"✓ Parsed {len(transactions)} records")
-        except Exception as e:
-            print(f"✗ Error parsing transactions: {str(e)}")
+        if not transactions:
+            print("✗ Error: No transactions parsed")
             return
+        print(f"✓ Parsed {len(transactions)} records")
         print()
         
         # Step 3: Display filter options
         print("[3/10] Filter Options Available:")
+        scanned = False
         try:
-            # Get available regions and amount range from transactions
-            regions = sorted(set(t.get('Region', '') for t in transactions if t.get('Region')))
-            amounts = [t.get('Quantity', 0) * t.get('UnitPrice', 0) for t in transactions 
-                      if isinstance(t.get('Quantity'), (int, float)) and isinstance(t.get('UnitPrice'), (int, float))]
+            # Validate once and collect the regions and amount range in the same pass
+            (valid_transactions, invalid_count, filter_summary,
+             regions, min_amount, max_amount) = scan_and_validate(transactions, columns=columns)
+            scanned = True
             
-            if amounts:
-                min_amount = min(amounts)
-                max_amount = max(amounts)
-                print(f"Regions: {', '.join(regions)}")
+            print(f"Regions: {', '.join(regions)}")
+            if min_amount is not None:
                 print(f"Amount Range: ₹{min_amount:,.2f} - ₹{max_amount:,.2f}")
             else:
-                print(f"Regions: {', '.join(regions)}")
                 print("Amount Range: N/A")
         except Exception as e:
             print(f"✗ Error getting filter options: {str(e)}")
             regions = []
-            amounts = []
         
         print()
         filter_choice = input("Do you want to filter data? (y/n): ").strip().lower()
@@ -149,15 +148,24 @@ def main():
         # Step 5: Validate transactions
         print("[4/10] Validating transactions...")
         try:
-            if filter_choice == 'y' and (region_filter or min_amount_filter is not None or max_amount_filter is not None):
+            use_filters = filter_choice == 'y' and (region_filter or min_amount_filter is not None or max_amount_filter is not None)
+            if not scanned:
                 valid_transactions, invalid_count, filter_summary = validate_and_filter(
                     transactions,
+                    region=region_filter if use_filters else None,
+                    min_amount=min_amount_filter if use_filters else None,
+                    max_amount=max_amount_filter if use_filters else None
+                )
+            elif use_filters:
+                # Re-use the already validated transactions; only the filters run here
+                valid_transactions, filtered_by_region, filtered_by_amount = apply_filters(
+                    valid_transactions,
                     region=region_filter,
                     min_amount=min_amount_filter,
                     max_amount=max_amount_filter
                 )
-            else:
-                valid_transactions, invalid_count, filter_summary = validate_and_filter(transactions)
+                filter_summary = build_filter_summary(len(transactions), invalid_count, filtered_by_region,
+                                                      filtered_by_amount, len(valid_transactions))
             
             print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}")
         except Exception as e:
@@ -169,15 +177,26 @@ def main():
         
         # Step 6: Perform all data analyses
         print("[5/10] Analyzing sales data...")
+        valid_columns = None
         try:
             # Call all analysis functions (they don't need to be stored, just called)
-            total_revenue = calculate_total_revenue(valid_transactions)
-            region_stats = region_wise_sales(valid_transactions)
-            top_products = top_selling_products(valid_transactions, n=5)
-            customer_stats = customer_analysis(valid_transactions)
-            daily_trend = daily_sales_trend(valid_transactions)
-            peak_day = find_peak_sales_day(valid_transactions)
-            low_performers = low_performing_products(valid_transactions, threshold=10)
+            valid_columns = build_columns(valid_transactions)
+            total_revenue = calculate_total_revenue_arr(valid_columns['Quantity'], valid_columns['UnitPrice'])
+            region_stats = region_wise_sales_arr(valid_columns['Region'], valid_columns['Amount'],
+                                                 total_revenue=total_revenue)
+            top_products = top_selling_products_arr(
+                valid_columns['ProductName'], valid_columns['Quantity'], valid_columns['Amount'], n=5
+            )
+            customer_stats = customer_analysis_arr(
+                valid_columns['CustomerID'], valid_columns['ProductName'], valid_columns['Amount']
+            )
+            daily_trend = daily_sales_trend_arr(
+                valid_columns['Date'], valid_columns['CustomerID'], valid_columns['Amount']
+            )
+            peak_day = find_peak_sales_day(valid_transactions, daily_stats=daily_trend)
+            low_performers = low_performing_products_arr(
+                valid_columns['ProductName'], valid_columns['Quantity'], valid_columns['Amount'], threshold=10
+            )
             
             print("✓ Analysis complete")
         except Exception as e:
@@ -201,14 +220,18 @@ def main():
         # Step 8: Enrich sales data
         print("[7/10] Enriching sales data...")
         enriched_transactions = []
+        enriched = False
         try:
             if api_products:
                 product_mapping = create_product_mapping(api_products)
-                enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
+                # Saved in the next step, so the write result can be checked
+                enriched_transactions = enrich_sales_data(valid_transactions, product_mapping,
+                                                          output_file=None)
+                enriched = True
                 
                 # Calculate enrichment stats
                 total_enriched = len(enriched_transactions)
-                successful = sum(1 for t in enriched_transactions if t.get('API_Match') == True)
+                successful = Counter(t.get('API_Match') for t in enriched_transactions)[True]
                 success_rate = (successful / total_enriched * 100) if total_enriched > 0 else 0
                 print(f"✓ Enriched {successful}/{total_enriched} transactions ({success_rate:.1f}%)")
             else:
@@ -219,42 +242,47 @@ def main():
             enriched_transactions = valid_transactions
         print()
         
-        # Step 9: Save enriched data (already done in enrich_sales_data, but confirm)
+        # Step 9: Save enriched data
         print("[8/10] Saving enriched data...")
-        try:
-            enriched_file = 'data/enriched_sales_data.txt'
-            if os.path.exists(enriched_file):
-                print(f"✓ Saved to: {enriched_file}")
-            else:
-                print("✗ Enriched data file not found")
-        except Exception as e:
-            print(f"✗ Error checking enriched data file: {str(e)}")
+        enriched_file = 'data/enriched_sales_data.txt'
+        enriched_ok = False
+        if enriched:
+            try:
+                enriched_ok = save_enriched_data(enriched_transactions, enriched_file)
+            except Exception as e:
+                print(f"✗ Error saving enriched data: {str(e)}")
+        if enriched_ok:
+            print(f"✓ Saved to: {enriched_file}")
+        else:
+            print("✗ Enriched data was not saved")
         print()
         
         # Step 10: Generate comprehensive report
         print("[9/10] Generating report...")
+        report_file = 'output/sales_report.txt'
+        report_ok = False
         try:
-            report_file = 'output/sales_report.txt'
-            generate_sales_report(valid_transactions, enriched_transactions, report_file)
-            if os.path.exists(report_file):
+            report_ok = generate_sales_report(valid_transactions, enriched_transactions, report_file,
+                                              columns=valid_columns)
+            if report_ok:
                 print(f"✓ Report saved to: {report_file}")
             else:
-                print("✗ Report file not found")
+                print("✗ Report was not saved")
         except Exception as e:
             print(f"✗ Error generating report: {str(e)}")
         print()
         
         # Step 11: Success message
         print("[10/10] Process Complete!")
-        print("=" * 40)
+        print(_BANNER_RULE)
         print()
         print("Generated Files:")
-        if os.path.exists('data/enriched_sales_data.txt'):
-            print(f"  - data/enriched_sales_data.txt")
-        if os.path.exists('output/sales_report.txt'):
-            print(f"  - output/sales_report.txt")
+        if enriched_ok:
+            print(f"  - {enriched_file}")
+        if report_ok:
+            print(f"  - {report_file}")
         print()
-        print("=" * 40)
+        print(_BANNER_RULE)
         
     except KeyboardInterrupt:
         print("\n\n✗ Process interrupted by user")
@@ -4,8 +4,62 @@ Uses DummyJSON API: https://dummyjson.com/products
 """
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, Optional, List
+from urllib3.util.retry import Retry
 import json
+import threading
+
+from utils.data_processor import SALES_FIELDS
+
+
+def _create_session():
+    """
+    Creates the shared HTTP session used by all API calls
+    Returns: requests.Session with a pooled, retrying adapter
+
+    Reusing one session keeps connections alive between calls, so repeated
+    requests to the API skip the TCP/TLS handshake. Transient failures
+    (429/5xx, failed connects) are retried up to twice with a short backoff;
+    after the last retry the final response is returned as usual. Read
+    timeouts are not retried, so a call takes at most three attempts and an
+    unreachable host costs about 3 x timeout plus 0.6s of backoff.
+    """
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=False,
+        status=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_SESSION = _create_session()
+
+# Successful single-product responses, keyed by (api_base_url, numeric_id)
+_PRODUCT_CACHE_SIZE = 4096
+_product_cache = {}
+# fetch_multiple_products fills the cache from worker threads
+_product_cache_lock = threading.Lock()
+
+
+def _cache_product(cache_key, data):
+    """
+    Stores a successful product response, evicting the oldest entry when full
+    """
+    with _product_cache_lock:
+        if cache_key not in _product_cache and len(_product_cache) >= _PRODUCT_CACHE_SIZE:
+            _product_cache.pop(next(iter(_product_cache)), None)
+        _product_cache[cache_key] = data
 
 
 def fetch_product_info(product_id: str, api_base_url: str = 'https://dummyjson.com/products') -> Optional[Dict]:
@@ -18,6 +72,8 @@ def fetch_product_info(product_id: str, api_base_url: str = 'https://dummyjson.c
     
     Returns:
         Dictionary containing product information, or None if fetch fails
+        Successful lookups are cached per (api_base_url, numeric ID) for the
+        life of the process; errors are never cached.
         
     Example response:
         {
@@ -46,13 +102,27 @@ def fetch_product_info(product_id: str, api_base_url: str = 'https://dummyjson.c
             'message': f'Invalid product ID format: {product_id}'
         }
     
+    # Repeated IDs are answered from the in-process cache (successes only);
+    # each caller gets its own shallow copy, so mutating a result cannot
+    # change what later callers or other threads see
+    cache_key = (api_base_url, numeric_id)
+    cached_data = _product_cache.get(cache_key)
+    if cached_data is not None:
+        return {
+            'product_id': product_id,
+            'api_status': 'success',
+            'data': dict(cached_data)
+        }
+    
     # Construct API URL for single product
     api_url = f"{api_base_url}/{numeric_id}"
     
     try:
-        response = requests.get(api_url, timeout=5)
+        response = _SESSION.get(api_url, timeout=5)
         if response.status_code == 200:
             data = response.json()
+            if isinstance(data, dict):
+                _cache_product(cache_key, dict(data))
             # Return standardized product info structure
             return {
                 'product_id': product_id,
@@ -88,6 +158,24 @@ def fetch_product_info(product_id: str, api_base_url: str = 'https://dummyjson.c
         }
 
 
+# Products per request when paging through the catalog
+_PAGE_SIZE = 100
+
+
+def _fetch_products_page(api_url, skip):
+    """
+    Fetches one page of the product catalog starting at offset skip
+    Returns: tuple (status_code or error message, list of product dictionaries)
+    """
+    try:
+        response = _SESSION.get(f"{api_url}?limit={_PAGE_SIZE}&skip={skip}", timeout=10)
+        if response.status_code != 200:
+            return response.status_code, []
+        return response.status_code, response.json().get('products', [])
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return str(e), []
+
+
 def fetch_all_products():
     """
     Fetches all products from DummyJSON API
@@ -107,18 +195,39 @@ def fetch_all_products():
     ]
     
     Requirements:
-    - Fetch all available products (use limit=100)
+    - Fetch all available products (use limit=100, paging with skip
+      when the catalog 'total' is larger than one page)
     - Handle connection errors with try-except
     - Return empty list if API fails
     - Print status message (success/failure)
     """
-    api_url = 'https://dummyjson.com/products?limit=100'
+    api_url = 'https://dummyjson.com/products'
     
     try:
-        response = requests.get(api_url, timeout=10)
+        response = _SESSION.get(f"{api_url}?limit={_PAGE_SIZE}", timeout=10)
         if response.status_code == 200:
             data = response.json()
             products = data.get('products', [])
+            try:
+                total = int(data.get('total', len(products)))
+            except (TypeError, ValueError):
+                total = len(products)
+            
+            # The first page gives the catalog total and the page size the server
+            # honours; fetch any remaining pages concurrently
+            page_size = len(products)
+            skips = range(page_size, total, page_size) if page_size else range(0)
+            if skips:
+                with ThreadPoolExecutor(max_workers=min(8, len(skips))) as executor:
+                    pages = list(executor.map(lambda skip: _fetch_products_page(api_url, skip), skips))
+                # A failed page is reported and skipped; the pages that did
+                # arrive are still returned
+                for skip, (status_code, page) in zip(skips, pages):
+                    if status_code != 200:
+                        print(f"✗ API request for products {skip}-{skip + page_size - 1} failed: {status_code}")
+                        continue
+                    products.extend(page)
+            
             print(f"✓ Successfully fetched {len(products)} products from API")
             return products
         else:
@@ -152,7 +261,7 @@ def search_products(query: str, api_base_url: str = 'https://dummyjson.com/produ
     api_url = f"{api_base_url}/search?q={query}"
     
     try:
-        response = requests.get(api_url, timeout=10)
+        response = _SESSION.get(api_url, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
@@ -173,21 +282,29 @@ def search_products(query: str, api_base_url: str = 'https://dummyjson.com/produ
         }
 
 
-def fetch_multiple_products(product_ids: list, api_base_url: str = 'https://dummyjson.com/products') -> Dict[str, Dict]:
+def fetch_multiple_products(product_ids: list, api_base_url: str = 'https://dummyjson.com/products',
+                            max_workers: int = 32) -> Dict[str, Dict]:
     """
     Fetch information for multiple products.
     
     Args:
         product_ids: List of product IDs to fetch (e.g., ['P101', 'P102'])
         api_base_url: Base URL for the API (default: DummyJSON)
+        max_workers: Maximum number of requests in flight at once
     
     Returns:
         Dictionary mapping product IDs to their information
+        (in first-seen order of product_ids)
     """
-    results = {}
-    for product_id in product_ids:
-        results[product_id] = fetch_product_info(product_id, api_base_url)
-    return results
+    # Each ID is fetched once; requests run on a thread pool so their network
+    # wait times overlap instead of adding up
+    unique_ids = list(dict.fromkeys(product_ids))
+    if not unique_ids:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_ids))) as executor:
+        infos = executor.map(lambda product_id: fetch_product_info(product_id, api_base_url), unique_ids)
+        return dict(zip(unique_ids, infos))
 
 
 def create_product_mapping(api_products):
@@ -218,12 +335,45 @@ def create_product_mapping(api_products):
     return product_mapping
 
 
-def enrich_sales_data(transactions, product_mapping):
+def _api_fields(product_id, product_mapping):
+    """
+    Looks up the API enrichment fields for one ProductID
+    Returns: dict with API_Category, API_Brand, API_Rating and API_Match
+    """
+    # Extract numeric ID from ProductID (P101 → 101, P5 → 5)
+    try:
+        # Remove 'P' prefix (case insensitive) and convert to int
+        numeric_id = int(product_id.replace('P', '').replace('p', ''))
+    except (ValueError, AttributeError, TypeError):
+        numeric_id = None
+    
+    # Check if product exists in mapping
+    if numeric_id is not None and numeric_id in product_mapping:
+        product_info = product_mapping[numeric_id]
+        return {
+            'API_Category': product_info.get('category', ''),
+            'API_Brand': product_info.get('brand', ''),
+            'API_Rating': product_info.get('rating', 0.0),
+            'API_Match': True
+        }
+    
+    # Product not found in mapping
+    return {
+        'API_Category': None,
+        'API_Brand': None,
+        'API_Rating': None,
+        'API_Match': False
+    }
+
+
+def enrich_sales_data(transactions, product_mapping, output_file='data/enriched_sales_data.txt'):
     """
     Enriches transaction data with API product information
     Parameters:
     - transactions: list of transaction dictionaries
     - product_mapping: dictionary from create_product_mapping()
+    - output_file: where save_enriched_data() writes the result; None skips
+      saving so the caller can save (and check the result) itself
     Returns: list of enriched transaction dictionaries
     
     Expected Output Format (each transaction):
@@ -256,40 +406,61 @@ def enrich_sales_data(transactions, product_mapping):
     """
     enriched_transactions = []
     
+    # API fields are resolved once per distinct ProductID and shared by its rows
+    fields_by_product = {}
+    
     for transaction in transactions:
-        # Create a copy of the transaction
-        enriched = transaction.copy()
-        
-        # Extract numeric ID from ProductID (P101 → 101, P5 → 5)
+        product_id = transaction.get('ProductID', '')
         try:
-            product_id_str = transaction.get('ProductID', '')
-            # Remove 'P' prefix (case insensitive) and convert to int
-            numeric_id = int(product_id_str.replace('P', '').replace('p', '').replace('P', ''))
-        except (ValueError, AttributeError, TypeError):
-            numeric_id = None
-        
-        # Check if product exists in mapping
-        if numeric_id is not None and numeric_id in product_mapping:
-            product_info = product_mapping[numeric_id]
-            enriched['API_Category'] = product_info.get('category', '')
-            enriched['API_Brand'] = product_info.get('brand', '')
-            enriched['API_Rating'] = product_info.get('rating', 0.0)
-            enriched['API_Match'] = True
-        else:
-            # Product not found in mapping
-            enriched['API_Category'] = None
-            enriched['API_Brand'] = None
-            enriched['API_Rating'] = None
-            enriched['API_Match'] = False
+            api_fields = fields_by_product[product_id]
+        except KeyError:
+            api_fields = fields_by_product[product_id] = _api_fields(product_id, product_mapping)
+        except TypeError:
+            # Unhashable ProductID - resolve without caching
+            api_fields = _api_fields(product_id, product_mapping)
         
+        # Copy the transaction and add the API fields
+        enriched = transaction.copy()
+        enriched.update(api_fields)
         enriched_transactions.append(enriched)
     
     # Save enriched data to file
-    save_enriched_data(enriched_transactions)
+    if output_file is not None:
+        save_enriched_data(enriched_transactions, output_file)
     
     return enriched_transactions
 
 
+# Column order of the enriched data file: SALES_FIELDS, then the API fields
+_API_FIELDS = ('API_Category', 'API_Brand', 'API_Rating')
+_ENRICHED_FIELDS = SALES_FIELDS + _API_FIELDS + ('API_Match',)
+
+
+def _format_enriched_row(transaction):
+    """
+    Formats one enriched transaction as a pipe-delimited line (no newline)
+    """
+    get = transaction.get
+    category = get('API_Category')
+    brand = get('API_Brand')
+    rating = get('API_Rating')
+    
+    # One f-string specialised to the fixed column order (_ENRICHED_FIELDS,
+    # checked below); missing API fields (None) become empty
+    return (
+        f"{get('TransactionID', '')}|{get('Date', '')}|{get('ProductID', '')}|{get('ProductName', '')}|"
+        f"{get('Quantity', '')}|{get('UnitPrice', '')}|{get('CustomerID', '')}|{get('Region', '')}|"
+        f"{'' if category is None else category}|{'' if brand is None else brand}|"
+        f"{'' if rating is None else rating}|{get('API_Match', False)}"
+    )
+
+
+# The f-string above must follow the file header: a row whose values are its
+# own field names has to format to exactly that column order
+assert (_format_enriched_row({field: field for field in _ENRICHED_FIELDS})
+        == '|'.join(_ENRICHED_FIELDS)), "_format_enriched_row is out of sync with _ENRICHED_FIELDS"
+
+
 def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data.txt'):
     """
     Saves enriched transactions back to file
@@ -303,46 +474,29 @@ def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data
     - Create output file with all original + new fields
     - Use pipe delimiter
     - Handle None values appropriately
+
+    Returns: True if the file was written, False otherwise
     """
     import os
     
-    # Create data directory if it doesn't exist
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    
     # Define header
-    header = 'TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|API_Category|API_Brand|API_Rating|API_Match'
-    
-    # Prepare lines
-    lines = [header]
-    
-    for transaction in enriched_transactions:
-        # Extract all fields in order
-        fields = [
-            str(transaction.get('TransactionID', '')),
-            str(transaction.get('Date', '')),
-            str(transaction.get('ProductID', '')),
-            str(transaction.get('ProductName', '')),
-            str(transaction.get('Quantity', '')),
-            str(transaction.get('UnitPrice', '')),
-            str(transaction.get('CustomerID', '')),
-            str(transaction.get('Region', '')),
-            str(transaction.get('API_Category', '')) if transaction.get('API_Category') is not None else '',
-            str(transaction.get('API_Brand', '')) if transaction.get('API_Brand') is not None else '',
-            str(transaction.get('API_Rating', '')) if transaction.get('API_Rating') is not None else '',
-            str(transaction.get('API_Match', False))
-        ]
-        
-        # Join with pipe delimiter
-        line = '|'.join(fields)
-        lines.append(line)
+    header = '|'.join(_ENRICHED_FIELDS)
     
-    # Write to file
+    # Stream rows to the file as they are formatted instead of joining them first
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        # Create data directory if it doesn't exist
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(header)
+            f.writelines(f"\n{_format_enriched_row(transaction)}" for transaction in enriched_transactions)
         print(f"✓ Enriched data saved to {filename}")
+        return True
     except Exception as e:
         print(f"✗ Error saving enriched data: {str(e)}")
+        return False
 
 
 def get_unique_product_ids(records: list) -> list:
@@ -353,11 +507,7 @@ def get_unique_product_ids(records: list) -> list:
         records: List of sales records
     
     Returns:
-        List of unique product IDs
+        List of unique product IDs (sorted)
     """
-    product_ids = set()
-    for record in records:
-        if 'ProductID' in record:
-            product_ids.add(record['ProductID'])
-    return sorted(list(product_ids))
+    return sorted({record['ProductID'] for record in records if 'ProductID' in record})
 
@@ -0,0 +1,111 @@
+"""
+Cache module for parsed sales data.
+Stores parsed transactions on disk so unchanged input files are not re-parsed.
+"""
+
+import hashlib
+import os
+import pickle
+
+from utils.file_handler import read_sales_data
+from utils.data_processor import parse_transactions, build_columns
+
+
+CACHE_VERSION = 3
+
+
+def _cache_key(filename):
+    """
+    Builds the cache key for a data file from its path, mtime and size
+    Returns: tuple, or None if the file cannot be stat-ed
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (CACHE_VERSION, os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+
+def _read_cache(cache_file, key):
+    """
+    Loads a cached parse result stored under key
+    Returns: tuple (line_count, transactions, columns), or None if unusable
+
+    The parsed data is stored as a separately pickled payload with a SHA-256
+    digest, so a damaged file is rejected before the payload is unpickled
+    and a corrupted value cannot load silently.
+    """
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+        if not (isinstance(cached, dict) and cached.get('key') == key):
+            return None
+        payload = cached.get('payload')
+        if not (isinstance(payload, bytes)
+                and hashlib.sha256(payload).hexdigest() == cached.get('digest')):
+            return None
+        data = pickle.loads(payload)
+    except Exception:
+        # Missing, unreadable, corrupt or incompatible cache
+        return None
+
+    if not (isinstance(data, dict)
+            and type(data.get('line_count')) is int
+            and isinstance(data.get('transactions'), list)
+            and isinstance(data.get('columns'), dict)):
+        return None
+    return (data['line_count'], data['transactions'], data['columns'])
+
+
+def load_or_parse(filename, cache_file=None):
+    """
+    Reads and parses a sales data file, reusing a cached result when possible
+    Returns: tuple (line_count, transactions, columns)
+
+    - line_count: number of raw data lines read (as len(read_sales_data(...)))
+    - transactions: output of parse_transactions()
+    - columns: output of build_columns(transactions)
+
+    Requirements:
+    - Cache lives next to the data file ('.sales_cache.pkl') unless cache_file is given
+    - Cache is only used when path, mtime and size all match the stored key
+    - Any problem reading or writing the cache falls back to a normal parse
+      (a damaged or mismatched cache is re-parsed and rewritten)
+
+    The cache is a pickle, and unpickling can execute arbitrary code: only
+    point cache_file at a file written by this program in a directory that
+    untrusted users cannot write to.
+    """
+    if cache_file is None:
+        cache_file = os.path.join(os.path.dirname(filename), '.sales_cache.pkl')
+
+    key = _cache_key(filename)
+
+    # Try the cache first
+    if key is not None:
+        cached = _read_cache(cache_file, key)
+        if cached is not None:
+            return cached
+
+    # Cache miss: read, parse and build the columnar view
+    raw_lines = read_sales_data(filename)
+    transactions = parse_transactions(raw_lines)
+    columns = build_columns(transactions)
+
+    if key is not None and raw_lines:
+        try:
+            payload = pickle.dumps({
+                'line_count': len(raw_lines),
+                'transactions': transactions,
+                'columns': columns
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(cache_file, 'wb') as f:
+                pickle.dump({
+                    'key': key,
+                    'digest': hashlib.sha256(payload).hexdigest(),
+                    'payload': payload
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"✗ Could not write parse cache: {str(e)}")
+
+    return (len(raw_lines), transactions, columns)
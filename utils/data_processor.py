@@ -2,10 +2,32 @@
 Data processor module for cleaning and validating sales data.
 """
 
-from typing import List, Dict, Tuple, Optional
+import heapq
+import re
+from array import array
+from collections import Counter, defaultdict
+from itertools import compress, islice
+from operator import and_, mul
+from typing import List, Dict, Iterable, Tuple, Optional
 from datetime import datetime
 
 
+# Field order of a pipe-delimited sales row; every field is required
+SALES_FIELDS = ('TransactionID', 'Date', 'ProductID', 'ProductName',
+                'Quantity', 'UnitPrice', 'CustomerID', 'Region')
+
+# Plain decimal number, optionally signed, with optional thousands commas
+_NUMBER_RE = re.compile(r'[+-]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)')
+
+# Report separators and fixed title, built once at import
+_EQ = "=" * 50
+_DASH = "-" * 50
+_REPORT_TITLE = f"{_EQ}\n     SALES ANALYTICS REPORT\n"
+
+# Upper bound on the per-group bitmaps built by _unique_per_group()
+_BITMAP_MAX_BYTES = 1 << 24
+
+
 def parse_transactions(raw_lines):
     """
     Parses raw lines into clean list of dictionaries
@@ -36,40 +58,51 @@ def parse_transactions(raw_lines):
     - Convert Quantity to int
     - Convert UnitPrice to float
     - Skip rows with incorrect number of fields
+
+    raw_lines may be any iterable of lines; it is consumed in a single pass.
+    Every returned transaction has all eight keys, with Quantity an int and
+    UnitPrice a float; the analysis functions below rely on this: they index
+    the fields directly, do not re-parse values and raise ValueError on a
+    malformed row instead of skipping it.
     """
-    expected_fields = ['TransactionID', 'Date', 'ProductID', 'ProductName', 
-                      'Quantity', 'UnitPrice', 'CustomerID', 'Region']
-    expected_field_count = len(expected_fields)
+    expected_field_count = len(SALES_FIELDS)
     
     transactions = []
+    append = transactions.append
     
     for line in raw_lines:
         # Split by pipe delimiter
-        fields = [field.strip() for field in line.split('|')]
+        fields = line.split('|')
         
         # Skip rows with incorrect number of fields
         if len(fields) != expected_field_count:
             continue
         
+        (transaction_id, date, product_id, product_name,
+         quantity_str, unit_price_str, customer_id, region) = fields
+        
         try:
-            # Create transaction dictionary
-            transaction = {}
-            for i, field_name in enumerate(expected_fields):
-                transaction[field_name] = fields[i]
-            
-            # Handle commas within ProductName (remove commas)
-            if 'ProductName' in transaction:
-                transaction['ProductName'] = transaction['ProductName'].replace(',', '')
-            
-            # Remove commas from Quantity and convert to int
-            quantity_str = transaction.get('Quantity', '0').replace(',', '')
-            transaction['Quantity'] = int(float(quantity_str))
-            
-            # Remove commas from UnitPrice and convert to float
-            unit_price_str = transaction.get('UnitPrice', '0').replace(',', '')
-            transaction['UnitPrice'] = float(unit_price_str)
+            # Whole-number quantities parse as int directly; others such as '2.0'
+            # go through float and are truncated
+            quantity_str = quantity_str.replace(',', '')
+            try:
+                quantity = int(quantity_str)
+            except ValueError:
+                quantity = int(float(quantity_str))
             
-            transactions.append(transaction)
+            # Build the transaction in one literal (same key order as SALES_FIELDS):
+            # commas are removed from ProductName and the numeric fields.
+            # Only text fields are stripped; int()/float() already ignore surrounding whitespace.
+            append({
+                'TransactionID': transaction_id.strip(),
+                'Date': date.strip(),
+                'ProductID': product_id.strip(),
+                'ProductName': product_name.strip().replace(',', ''),
+                'Quantity': quantity,
+                'UnitPrice': float(unit_price_str.replace(',', '')),
+                'CustomerID': customer_id.strip(),
+                'Region': region.strip()
+            })
         except (ValueError, TypeError):
             # Skip rows that can't be converted properly
             continue
@@ -77,7 +110,208 @@ def parse_transactions(raw_lines):
     return transactions
 
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def _factorize(values):
+    """
+    Encodes values as integer codes in order of first appearance
+    Returns: tuple (codes, labels) where labels[codes[i]] == values[i]
+    """
+    code_map = {}
+    codes = array('i')
+    for value in values:
+        code = code_map.get(value)
+        if code is None:
+            code = code_map[value] = len(code_map)
+        codes.append(code)
+    return codes, list(code_map)
+
+
+def _bincount(codes, n_groups, weights=None):
+    """
+    Counts (or sums weights) per integer code, like numpy.bincount
+    Returns: list of length n_groups
+    """
+    if weights is None:
+        counts = [0] * n_groups
+        for code in codes:
+            counts[code] += 1
+        return counts
+
+    totals = [0.0] * n_groups
+    for code, weight in zip(codes, weights):
+        totals[code] += weight
+    return totals
+
+
+def _aggregate_by_code(codes, quantities, amounts, n_groups):
+    """
+    Sums quantities and amounts per integer code in a single pass
+    Returns: tuple (total_quantity, total_revenue), lists of length n_groups
+    """
+    total_quantity = [0] * n_groups
+    total_revenue = [0.0] * n_groups
+    for code, quantity, amount in zip(codes, quantities, amounts):
+        total_quantity[code] += quantity
+        total_revenue[code] += amount
+    return total_quantity, total_revenue
+
+
+def _popcount(value):
+    """
+    Counts the set bits of a non-negative int
+    Returns: int
+
+    int.bit_count() is only available from Python 3.10; older versions
+    count the '1' digits of the binary representation instead.
+    """
+    return bin(value).count('1')
+
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+
+
+def _unique_per_group(codes, member_codes, n_groups, member_labels):
+    """
+    Counts the distinct non-empty members of each group
+    Returns: list of counts, one per group code
+
+    Member codes from _factorize() are dense, so each group gets a bitmap
+    indexed by member code and the count is its popcount. Falls back to a
+    set of (group, member) pairs when the bitmaps would be too large.
+    """
+    n_members = len(member_labels)
+    bitmap_size = (n_members >> 3) + 1
+    
+    if n_groups * bitmap_size > _BITMAP_MAX_BYTES:
+        unique = [0] * n_groups
+        for code, member_code in set(zip(codes, member_codes)):
+            if member_labels[member_code]:
+                unique[code] += 1
+        return unique
+    
+    bitmaps = [bytearray(bitmap_size) for _ in range(n_groups)]
+    for code, member_code in zip(codes, member_codes):
+        bitmaps[code][member_code >> 3] |= 1 << (member_code & 7)
+    
+    # Empty labels (missing IDs) are not counted as members
+    empty_codes = [i for i, label in enumerate(member_labels) if not label]
+    unique = []
+    for bitmap in bitmaps:
+        for empty_code in empty_codes:
+            bitmap[empty_code >> 3] &= ~(1 << (empty_code & 7)) & 0xFF
+        unique.append(_popcount(int.from_bytes(bitmap, 'little')))
+    return unique
+
+
+def build_columns(transactions):
+    """
+    Builds a columnar (structure-of-arrays) view of parsed transactions
+
+    Returns: dictionary of columns
+
+    Expected Output Format:
+    {
+        'TransactionID': ['T001', 'T002', ...],
+        'Date': (array('i', [0, 0, 1, ...]), ['2024-12-01', '2024-12-02', ...]),
+        'ProductID': (array('i', [...]), ['P101', 'P102', ...]),
+        'Quantity': array('q', [2, 5, ...]),
+        'UnitPrice': array('d', [45000.0, 500.0, ...]),
+        'Amount': array('d', [90000.0, 2500.0, ...]),   # Quantity * UnitPrice
+        'Region': (array('i', [0, 1, ...]), ['North', 'South', ...]),
+        'ProductName': (array('i', [...]), ['Laptop', 'Mouse', ...]),
+        'CustomerID': (array('i', [...]), ['C001', 'C002', ...])
+    }
+
+    Requirements:
+    - Expects the output of parse_transactions (numeric Quantity/UnitPrice)
+    - Numeric columns are contiguous typed arrays
+    - Categorical columns are (codes, labels) pairs, labels in first-seen order
+    - Quantity falls back to a plain list if a value does not fit in 64 bits
+    """
+    quantities = [t['Quantity'] for t in transactions]
+    try:
+        quantities = array('q', quantities)
+    except OverflowError:
+        pass
+    unit_prices = array('d', [t['UnitPrice'] for t in transactions])
+    amounts = array('d', [q * p for q, p in zip(quantities, unit_prices)])
+
+    return {
+        'TransactionID': [t['TransactionID'] for t in transactions],
+        'Date': _factorize([t['Date'] for t in transactions]),
+        'ProductID': _factorize([t['ProductID'] for t in transactions]),
+        'Quantity': quantities,
+        'UnitPrice': unit_prices,
+        'Amount': amounts,
+        'Region': _factorize([t['Region'] for t in transactions]),
+        'ProductName': _factorize([t['ProductName'] for t in transactions]),
+        'CustomerID': _factorize([t['CustomerID'] for t in transactions])
+    }
+
+
+def _label_mask(column, predicate):
+    """
+    Evaluates predicate once per distinct label of a (codes, labels) column
+    Returns: list of bools, one per row
+    """
+    codes, labels = column
+    label_ok = [bool(predicate(label)) for label in labels]
+    return list(map(label_ok.__getitem__, codes))
+
+
+def validation_mask(columns):
+    """
+    Evaluates the validation rules of validate_and_filter() column by column
+
+    Parameters: columns from build_columns()
+    Returns: list of bools, one per transaction (True = valid)
+
+    String rules run once per distinct label and are broadcast through the
+    codes; numeric rules run over the typed arrays. The per-column masks are
+    then combined with an element-wise AND.
+    """
+    column_masks = [
+        [transaction_id[:1] == 'T' for transaction_id in columns['TransactionID']],
+        _label_mask(columns['Date'], bool),
+        _label_mask(columns['ProductID'], lambda product_id: product_id[:1] == 'P'),
+        _label_mask(columns['ProductName'], bool),
+        _label_mask(columns['CustomerID'], lambda customer_id: customer_id[:1] == 'C'),
+        _label_mask(columns['Region'], bool),
+        [quantity > 0 for quantity in columns['Quantity']],
+        # 'not <= 0' (rather than '> 0') matches the row-wise check for NaN prices
+        [not unit_price <= 0 for unit_price in columns['UnitPrice']]
+    ]
+    
+    mask = column_masks[0]
+    for column_mask in column_masks[1:]:
+        mask = list(map(and_, mask, column_mask))
+    return mask
+
+
+def build_filter_summary(total_input, invalid, filtered_by_region, filtered_by_amount, final_count):
+    """
+    Builds the filter_summary dictionary returned by validate_and_filter()
+    Returns: dictionary of record counts
+
+    Expected Output Format:
+    {
+        'total_input': 100,
+        'invalid': 5,
+        'filtered_by_region': 20,
+        'filtered_by_amount': 10,
+        'final_count': 65
+    }
+    """
+    return {
+        'total_input': total_input,
+        'invalid': invalid,
+        'filtered_by_region': filtered_by_region,
+        'filtered_by_amount': filtered_by_amount,
+        'final_count': final_count
+    }
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, columns=None):
     """
     Validates transactions and applies optional filters
 
@@ -86,6 +320,8 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     - region: filter by specific region (optional)
     - min_amount: minimum transaction amount (Quantity * UnitPrice) (optional)
     - max_amount: maximum transaction amount (optional)
+    - columns: build_columns(transactions) (optional); when given, validation
+      runs as column masks (see validation_mask()) instead of per-row checks
 
     Returns: tuple (valid_transactions, invalid_count, filter_summary)
 
@@ -115,120 +351,261 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     - Print transaction amount range (min/max) to user
     - Show count of records after each filter applied
     """
-    required_fields = ['TransactionID', 'Date', 'ProductID', 'ProductName', 
-                      'Quantity', 'UnitPrice', 'CustomerID', 'Region']
-    
     total_input = len(transactions)
+    
+    # Validate transactions
+    if columns is not None:
+        valid_transactions = list(compress(transactions, validation_mask(columns)))
+    else:
+        valid_transactions = list(filter(_is_valid_transaction, transactions))
+    invalid_count = total_input - len(valid_transactions)
+    
+    # Filter Display: Print available regions
+    if valid_transactions:
+        available_regions = sorted(set(t.get('Region', '') for t in valid_transactions if t.get('Region')))
+        print(f"\nAvailable regions: {', '.join(available_regions)}")
+        
+        # Track the transaction amount range in one pass (no list of amounts)
+        min_transaction_amount = None
+        max_transaction_amount = None
+        for t in valid_transactions:
+            amount = t['Quantity'] * t['UnitPrice']
+            if min_transaction_amount is None or amount < min_transaction_amount:
+                min_transaction_amount = amount
+            if max_transaction_amount is None or amount > max_transaction_amount:
+                max_transaction_amount = amount
+        print(f"Transaction amount range: ${min_transaction_amount:,.2f} - ${max_transaction_amount:,.2f}")
+    
+    valid_transactions, filtered_by_region, filtered_by_amount = apply_filters(
+        valid_transactions, region=region, min_amount=min_amount, max_amount=max_amount
+    )
+    
+    final_count = len(valid_transactions)
+    
+    filter_summary = build_filter_summary(total_input, invalid_count, filtered_by_region,
+                                          filtered_by_amount, final_count)
+    
+    return (valid_transactions, invalid_count, filter_summary)
+
+
+def scan_and_validate(transactions, region=None, min_amount=None, max_amount=None, columns=None):
+    """
+    Validates transactions and collects the filter options in a single pass
+
+    Parameters: same as validate_and_filter(), plus
+    - columns: build_columns(transactions) (optional); when given, validation
+      runs as column masks (see validation_mask()) instead of per-row checks
+
+    Returns: tuple (valid_transactions, invalid_count, filter_summary,
+                    regions, min_amount, max_amount)
+
+    - The first three items match validate_and_filter()
+    - regions: sorted list of regions among the valid transactions
+    - min_amount / max_amount: transaction amount range of the valid
+      transactions before filtering (None if there are none)
+
+    Unlike validate_and_filter(), the available regions and amount range are
+    returned rather than printed, so the caller can show them before asking
+    for filter criteria and then call apply_filters() on the valid list.
+    """
+    if columns is not None:
+        return _scan_and_validate_columns(transactions, columns, region, min_amount, max_amount)
+    
     valid_transactions = []
     invalid_count = 0
+    regions = set()
+    min_transaction_amount = None
+    max_transaction_amount = None
     
-    # Validate transactions
     for transaction in transactions:
-        is_valid = True
-        
-        # Check all required fields are present
-        for field in required_fields:
-            if field not in transaction or not transaction[field]:
-                is_valid = False
-                break
-        
-        if not is_valid:
+        if not _is_valid_transaction(transaction):
             invalid_count += 1
             continue
         
-        # Check TransactionID starts with 'T'
-        transaction_id = str(transaction.get('TransactionID', '')).strip()
-        if not transaction_id.startswith('T'):
-            is_valid = False
+        valid_transactions.append(transaction)
+        regions.add(transaction['Region'])
         
-        # Check ProductID starts with 'P'
-        product_id = str(transaction.get('ProductID', '')).strip()
-        if not product_id.startswith('P'):
-            is_valid = False
-        
-        # Check CustomerID starts with 'C'
-        customer_id = str(transaction.get('CustomerID', '')).strip()
-        if not customer_id.startswith('C'):
-            is_valid = False
-        
-        # Check Quantity > 0
-        try:
-            quantity = transaction.get('Quantity', 0)
-            if isinstance(quantity, str):
-                quantity = int(float(quantity.replace(',', '')))
-            if quantity <= 0:
-                is_valid = False
-        except (ValueError, TypeError):
-            is_valid = False
-        
-        # Check UnitPrice > 0
-        try:
-            unit_price = transaction.get('UnitPrice', 0)
-            if isinstance(unit_price, str):
-                unit_price = float(unit_price.replace(',', ''))
-            if unit_price <= 0:
-                is_valid = False
-        except (ValueError, TypeError):
-            is_valid = False
-        
-        if is_valid:
-            valid_transactions.append(transaction)
-        else:
-            invalid_count += 1
+        amount = transaction['Quantity'] * transaction['UnitPrice']
+        if min_transaction_amount is None or amount < min_transaction_amount:
+            min_transaction_amount = amount
+        if max_transaction_amount is None or amount > max_transaction_amount:
+            max_transaction_amount = amount
+    
+    filtered_transactions, filtered_by_region, filtered_by_amount = apply_filters(
+        valid_transactions, region=region, min_amount=min_amount, max_amount=max_amount
+    )
     
-    # Filter Display: Print available regions
-    if valid_transactions:
-        available_regions = sorted(set(t.get('Region', '') for t in valid_transactions if t.get('Region')))
-        print(f"\nAvailable regions: {', '.join(available_regions)}")
-        
-        # Calculate transaction amounts
-        amounts = [t.get('Quantity', 0) * t.get('UnitPrice', 0) for t in valid_transactions]
-        if amounts:
-            min_transaction_amount = min(amounts)
-            max_transaction_amount = max(amounts)
-            print(f"Transaction amount range: ${min_transaction_amount:,.2f} - ${max_transaction_amount:,.2f}")
+    filter_summary = build_filter_summary(len(transactions), invalid_count, filtered_by_region,
+                                          filtered_by_amount, len(filtered_transactions))
+    
+    return (filtered_transactions, invalid_count, filter_summary,
+            sorted(regions), min_transaction_amount, max_transaction_amount)
+
+
+def _scan_and_validate_columns(transactions, columns, region, min_amount, max_amount):
+    """
+    Column-mask implementation of scan_and_validate()
+    Returns: same tuple as scan_and_validate()
+    """
+    mask = validation_mask(columns)
+    valid_transactions = list(compress(transactions, mask))
+    invalid_count = len(transactions) - len(valid_transactions)
     
+    region_codes, region_labels = columns['Region']
+    regions = sorted({region_labels[code] for code in compress(region_codes, mask)})
+    
+    valid_amounts = list(compress(columns['Amount'], mask))
+    min_transaction_amount = min(valid_amounts) if valid_amounts else None
+    max_transaction_amount = max(valid_amounts) if valid_amounts else None
+    
+    filtered_transactions, filtered_by_region, filtered_by_amount = apply_filters(
+        valid_transactions, region=region, min_amount=min_amount, max_amount=max_amount
+    )
+    
+    filter_summary = build_filter_summary(len(transactions), invalid_count, filtered_by_region,
+                                          filtered_by_amount, len(filtered_transactions))
+    
+    return (filtered_transactions, invalid_count, filter_summary,
+            regions, min_transaction_amount, max_transaction_amount)
+
+
+def apply_filters(transactions, region=None, min_amount=None, max_amount=None):
+    """
+    Applies the optional region and amount filters to validated transactions
+
+    Returns: tuple (filtered_transactions, filtered_by_region, filtered_by_amount)
+
+    Prints the count of records after each filter applied.
+    """
     filtered_by_region = 0
     filtered_by_amount = 0
+    total_input = len(transactions)
+    filter_by_amount = min_amount is not None or max_amount is not None
     
-    # Apply region filter
     if region is not None:
-        before_region_filter = len(valid_transactions)
-        valid_transactions = [t for t in valid_transactions if t.get('Region', '').strip() == str(region).strip()]
-        filtered_by_region = before_region_filter - len(valid_transactions)
-        print(f"After region filter ('{region}'): {len(valid_transactions)} records")
-    
-    # Apply amount filters
-    if min_amount is not None or max_amount is not None:
-        before_amount_filter = len(valid_transactions)
+        target_region = str(region).strip()
+    
+    if region is not None and filter_by_amount:
+        # Both filters: one pass, each row is dropped by the first filter it fails
         filtered_transactions = []
-        for t in valid_transactions:
-            amount = t.get('Quantity', 0) * t.get('UnitPrice', 0)
-            if min_amount is not None and amount < min_amount:
+        append = filtered_transactions.append
+        for t in transactions:
+            if t['Region'] != target_region:
+                filtered_by_region += 1
                 continue
-            if max_amount is not None and amount > max_amount:
+            amount = t['Quantity'] * t['UnitPrice']
+            if (min_amount is not None and amount < min_amount) or \
+                    (max_amount is not None and amount > max_amount):
+                filtered_by_amount += 1
                 continue
-            filtered_transactions.append(t)
-        valid_transactions = filtered_transactions
-        filtered_by_amount = before_amount_filter - len(valid_transactions)
+            append(t)
+        transactions = filtered_transactions
+    elif region is not None:
+        transactions = [t for t in transactions if t['Region'] == target_region]
+        filtered_by_region = total_input - len(transactions)
+    elif filter_by_amount:
+        transactions = _filter_by_amount(transactions, min_amount, max_amount)
+        filtered_by_amount = total_input - len(transactions)
+    
+    # Show count of records after each filter applied
+    if region is not None:
+        print(f"After region filter ('{region}'): {total_input - filtered_by_region} records")
+    
+    if filter_by_amount:
         filter_msg = []
         if min_amount is not None:
             filter_msg.append(f"min=${min_amount:,.2f}")
         if max_amount is not None:
             filter_msg.append(f"max=${max_amount:,.2f}")
-        print(f"After amount filter ({', '.join(filter_msg)}): {len(valid_transactions)} records")
+        print(f"After amount filter ({', '.join(filter_msg)}): {len(transactions)} records")
     
-    final_count = len(valid_transactions)
+    return (transactions, filtered_by_region, filtered_by_amount)
+
+
+def _filter_by_amount(transactions, min_amount, max_amount):
+    """
+    Keeps transactions whose amount is not below min_amount / above max_amount
+    Returns: filtered list
+
+    Dispatches once on which bounds are set, so each loop only performs the
+    comparisons it needs instead of re-checking the bounds for every row.
+    """
+    if max_amount is None:
+        return [t for t in transactions
+                if not t['Quantity'] * t['UnitPrice'] < min_amount]
+    
+    if min_amount is None:
+        return [t for t in transactions
+                if not t['Quantity'] * t['UnitPrice'] > max_amount]
+    
+    filtered_transactions = []
+    for t in transactions:
+        amount = t['Quantity'] * t['UnitPrice']
+        if amount < min_amount or amount > max_amount:
+            continue
+        filtered_transactions.append(t)
+    return filtered_transactions
+
+
+def _is_valid_transaction(transaction):
+    """
+    Checks a transaction against the validation rules of validate_and_filter()
+    Returns: bool
+    """
+    get = transaction.get
     
-    filter_summary = {
-        'total_input': total_input,
-        'invalid': invalid_count,
-        'filtered_by_region': filtered_by_region,
-        'filtered_by_amount': filtered_by_amount,
-        'final_count': final_count
-    }
+    # Check all required fields are present and non-empty
+    if not all(map(get, SALES_FIELDS)):
+        return False
     
-    return (valid_transactions, invalid_count, filter_summary)
+    # Check TransactionID / ProductID / CustomerID start with 'T' / 'P' / 'C'
+    if (str(get('TransactionID')).lstrip()[:1],
+            str(get('ProductID')).lstrip()[:1],
+            str(get('CustomerID')).lstrip()[:1]) != ('T', 'P', 'C'):
+        return False
+    
+    # Check Quantity > 0
+    try:
+        quantity = get('Quantity')
+        if isinstance(quantity, str):
+            quantity = int(float(quantity.replace(',', '')))
+        if quantity <= 0:
+            return False
+    except (ValueError, TypeError):
+        return False
+    
+    # Check UnitPrice > 0
+    try:
+        unit_price = get('UnitPrice')
+        if isinstance(unit_price, str):
+            unit_price = float(unit_price.replace(',', ''))
+        if unit_price <= 0:
+            return False
+    except (ValueError, TypeError):
+        return False
+    
+    return True
+
+
+_NUMERIC_FIELDS = ('Quantity', 'UnitPrice')
+
+
+def _malformed_transaction_error(transactions, fields, error):
+    """
+    Builds the error raised when an analysis fails on a malformed transaction
+    Returns: ValueError naming the first transaction and field at fault
+
+    Only called after the analysis loop has failed, so well-formed input pays
+    nothing for the check.
+    """
+    for index, transaction in enumerate(transactions):
+        for field in fields:
+            if field not in transaction:
+                return ValueError(f"Malformed transaction at index {index}: missing field '{field}'")
+            if field in _NUMERIC_FIELDS and not isinstance(transaction[field], (int, float)):
+                return ValueError(f"Malformed transaction at index {index}: "
+                                  f"'{field}' is not a number ({transaction[field]!r})")
+    return ValueError(f"Malformed transaction: {error!r}")
 
 
 def calculate_total_revenue(transactions):
@@ -238,30 +615,29 @@ def calculate_total_revenue(transactions):
     
     Expected Output: Single number representing sum of (Quantity * UnitPrice)
     Example: 1545000.50
+
+    Raises ValueError if a transaction lacks Quantity/UnitPrice or they are
+    not numbers.
     """
-    total_revenue = 0.0
-    
-    for transaction in transactions:
-        try:
-            quantity = transaction.get('Quantity', 0)
-            unit_price = transaction.get('UnitPrice', 0.0)
-            
-            # Ensure quantity and unit_price are numeric
-            if isinstance(quantity, str):
-                quantity = int(float(quantity.replace(',', '')))
-            if isinstance(unit_price, str):
-                unit_price = float(unit_price.replace(',', ''))
-            
-            revenue = quantity * unit_price
-            total_revenue += revenue
-        except (ValueError, TypeError, KeyError):
-            # Skip transactions with invalid data
-            continue
-    
-    return float(total_revenue)
+    try:
+        return float(sum(transaction['Quantity'] * transaction['UnitPrice']
+                         for transaction in transactions))
+    except (KeyError, TypeError) as e:
+        raise _malformed_transaction_error(transactions, _NUMERIC_FIELDS, e) from e
+
+
+def calculate_total_revenue_arr(quantities, unit_prices):
+    """
+    Calculates total revenue from columnar Quantity and UnitPrice arrays
+    Returns: float (total revenue)
+
+    Same result as calculate_total_revenue() for the matching transactions,
+    computed as a single dot product over the columns from build_columns().
+    """
+    return float(sum(map(mul, quantities, unit_prices)))
 
 
-def region_wise_sales(transactions):
+def region_wise_sales(transactions, total_revenue=None):
     """
     Analyzes sales by region
 
@@ -283,45 +659,43 @@ def region_wise_sales(transactions):
     - Count transactions per region
     - Calculate percentage of total sales
     - Sort by total_sales in descending order
+
+    total_revenue may be passed in when calculate_total_revenue() has already
+    been computed for the same transactions.
+
+    Raises ValueError if a transaction lacks Region, Quantity or UnitPrice,
+    or Quantity/UnitPrice is not a number.
     """
     # Calculate total revenue first (for percentage calculation)
-    total_revenue = calculate_total_revenue(transactions)
+    if total_revenue is None:
+        total_revenue = calculate_total_revenue(transactions)
     
-    # Initialize region statistics
-    region_stats = {}
+    # Per-region accumulators (one hashed += per row each)
+    region_sales = defaultdict(float)
+    region_counts = defaultdict(int)
     
     # Process each transaction
-    for transaction in transactions:
-        try:
-            region = transaction.get('Region', '').strip()
+    try:
+        for transaction in transactions:
+            region = transaction['Region']
             if not region:
                 continue
             
-            quantity = transaction.get('Quantity', 0)
-            unit_price = transaction.get('UnitPrice', 0.0)
-            
-            # Ensure quantity and unit_price are numeric
-            if isinstance(quantity, str):
-                quantity = int(float(quantity.replace(',', '')))
-            if isinstance(unit_price, str):
-                unit_price = float(unit_price.replace(',', ''))
+            quantity = transaction['Quantity']
+            unit_price = transaction['UnitPrice']
             
             sales_amount = quantity * unit_price
             
-            # Initialize region if not exists
-            if region not in region_stats:
-                region_stats[region] = {
-                    'total_sales': 0.0,
-                    'transaction_count': 0
-                }
-            
             # Update region statistics
-            region_stats[region]['total_sales'] += sales_amount
-            region_stats[region]['transaction_count'] += 1
-            
-        except (ValueError, TypeError, KeyError):
-            # Skip transactions with invalid data
-            continue
+            region_sales[region] += sales_amount
+            region_counts[region] += 1
+    except (KeyError, TypeError) as e:
+        raise _malformed_transaction_error(transactions, ('Region',) + _NUMERIC_FIELDS, e) from e
+    
+    region_stats = {
+        region: {'total_sales': total_sales, 'transaction_count': region_counts[region]}
+        for region, total_sales in region_sales.items()
+    }
     
     # Calculate percentage for each region
     for region in region_stats:
@@ -347,7 +721,77 @@ def region_wise_sales(transactions):
     return result
 
 
-def top_selling_products(transactions, n=5):
+def region_wise_sales_arr(region, amounts, total_revenue=None):
+    """
+    Analyzes sales by region from columnar data
+
+    Parameters:
+    - region: (codes, labels) pair from build_columns()['Region']
+    - amounts: build_columns()['Amount']
+    - total_revenue: calculate_total_revenue_arr() result, if already computed (optional)
+
+    Returns: dictionary with region statistics (same format as region_wise_sales)
+    """
+    codes, labels = region
+    if total_revenue is None:
+        total_revenue = float(sum(amounts))
+
+    # Weighted and plain bincount give per-region totals and counts in one pass each
+    totals = _bincount(codes, len(labels), weights=amounts)
+    counts = _bincount(codes, len(labels))
+
+    # Sort by total_sales in descending order (stable, like region_wise_sales)
+    order = sorted(range(len(labels)), key=totals.__getitem__, reverse=True)
+
+    result = {}
+    for i in order:
+        if not labels[i]:
+            continue
+        if total_revenue > 0:
+            percentage = round((totals[i] / total_revenue) * 100, 2)
+        else:
+            percentage = 0.0
+        result[labels[i]] = {
+            'total_sales': totals[i],
+            'transaction_count': counts[i],
+            'percentage': percentage
+        }
+
+    return result
+
+
+def _aggregate_products(transactions):
+    """
+    Sums quantity and revenue per ProductName in a single pass
+    Returns: tuple (total_quantity, total_revenue), dicts keyed by ProductName
+
+    Shared by top_selling_products() and low_performing_products(); pass the
+    result to either as product_totals to avoid a second pass.
+    """
+    # Per-product accumulators (one hashed += per row each)
+    total_quantity = defaultdict(int)
+    total_revenue = defaultdict(float)
+    
+    # Process each transaction
+    try:
+        for transaction in transactions:
+            product_name = transaction['ProductName']
+            if not product_name:
+                continue
+            
+            quantity = transaction['Quantity']
+            unit_price = transaction['UnitPrice']
+            
+            # Aggregate quantities and revenue
+            total_quantity[product_name] += quantity
+            total_revenue[product_name] += quantity * unit_price
+    except (KeyError, TypeError) as e:
+        raise _malformed_transaction_error(transactions, ('ProductName',) + _NUMERIC_FIELDS, e) from e
+    
+    return total_quantity, total_revenue
+
+
+def top_selling_products(transactions, n=5, product_totals=None):
     """
     Finds top n products by total quantity sold
     Returns: list of tuples
@@ -365,55 +809,52 @@ def top_selling_products(transactions, n=5):
     - Calculate total revenue for each product
     - Sort by TotalQuantity descending
     - Return top n products
+
+    product_totals may be passed in when _aggregate_products() has already
+    been computed for the same transactions.
+
+    Raises ValueError if a transaction lacks ProductName, Quantity or
+    UnitPrice, or Quantity/UnitPrice is not a number.
     """
-    # Dictionary to aggregate product data
-    product_stats = {}
-    
-    # Process each transaction
-    for transaction in transactions:
-        try:
-            product_name = transaction.get('ProductName', '').strip()
-            if not product_name:
-                continue
-            
-            quantity = transaction.get('Quantity', 0)
-            unit_price = transaction.get('UnitPrice', 0.0)
-            
-            # Ensure quantity and unit_price are numeric
-            if isinstance(quantity, str):
-                quantity = int(float(quantity.replace(',', '')))
-            if isinstance(unit_price, str):
-                unit_price = float(unit_price.replace(',', ''))
-            
-            # Initialize product if not exists
-            if product_name not in product_stats:
-                product_stats[product_name] = {
-                    'total_quantity': 0,
-                    'total_revenue': 0.0
-                }
-            
-            # Aggregate quantities and revenue
-            product_stats[product_name]['total_quantity'] += quantity
-            product_stats[product_name]['total_revenue'] += quantity * unit_price
-            
-        except (ValueError, TypeError, KeyError):
-            # Skip transactions with invalid data
-            continue
+    if product_totals is None:
+        product_totals = _aggregate_products(transactions)
+    total_quantity, total_revenue = product_totals
     
     # Convert to list of tuples: (ProductName, TotalQuantity, TotalRevenue)
-    product_list = []
-    for product_name, stats in product_stats.items():
-        product_list.append((
-            product_name,
-            stats['total_quantity'],
-            stats['total_revenue']
-        ))
-    
-    # Sort by TotalQuantity descending
-    product_list.sort(key=lambda x: x[1], reverse=True)
+    product_list = [
+        (product_name, quantity, total_revenue[product_name])
+        for product_name, quantity in total_quantity.items()
+    ]
     
-    # Return top n products
-    return product_list[:n]
+    # Return top n products by TotalQuantity descending
+    # (heap selection, same result as a full sort then [:n])
+    return heapq.nlargest(n, product_list, key=lambda x: x[1])
+
+
+def top_selling_products_arr(product, quantities, amounts, n=5, product_totals=None):
+    """
+    Finds top n products by total quantity sold from columnar data
+
+    Parameters:
+    - product: (codes, labels) pair from build_columns()['ProductName']
+    - quantities, amounts: build_columns()['Quantity'] and ['Amount']
+    - product_totals: _aggregate_by_code() result for these columns, if already computed (optional)
+
+    Returns: list of tuples (same format as top_selling_products)
+    """
+    codes, labels = product
+    if product_totals is None:
+        product_totals = _aggregate_by_code(codes, quantities, amounts, len(labels))
+    total_quantity, total_revenue = product_totals
+
+    # Top n by TotalQuantity descending (ties keep first-seen order)
+    top = heapq.nlargest(
+        n,
+        (i for i in range(len(labels)) if labels[i]),
+        key=total_quantity.__getitem__
+    )
+
+    return [(labels[i], total_quantity[i], total_revenue[i]) for i in top]
 
 
 def customer_analysis(transactions):
@@ -440,47 +881,39 @@ def customer_analysis(transactions):
     - Calculate average order value
     - List unique products bought
     - Sort by total_spent descending
+
+    Raises ValueError if a transaction lacks CustomerID, ProductName,
+    Quantity or UnitPrice, or Quantity/UnitPrice is not a number.
     """
-    # Dictionary to store customer statistics
-    customer_stats = {}
+    # One list-backed bucket per customer: [total_spent, purchase_count, products_bought]
+    # (a single hashed lookup per row; the set tracks unique products)
+    customers = defaultdict(lambda: [0.0, 0, set()])
     
     # Process each transaction
-    for transaction in transactions:
-        try:
-            customer_id = transaction.get('CustomerID', '').strip()
+    try:
+        for transaction in transactions:
+            customer_id = transaction['CustomerID']
             if not customer_id:
                 continue
             
-            quantity = transaction.get('Quantity', 0)
-            unit_price = transaction.get('UnitPrice', 0.0)
-            product_name = transaction.get('ProductName', '').strip()
-            
-            # Ensure quantity and unit_price are numeric
-            if isinstance(quantity, str):
-                quantity = int(float(quantity.replace(',', '')))
-            if isinstance(unit_price, str):
-                unit_price = float(unit_price.replace(',', ''))
-            
-            # Calculate transaction amount
-            transaction_amount = quantity * unit_price
-            
-            # Initialize customer if not exists
-            if customer_id not in customer_stats:
-                customer_stats[customer_id] = {
-                    'total_spent': 0.0,
-                    'purchase_count': 0,
-                    'products_bought': set()  # Use set to track unique products
-                }
-            
             # Update customer statistics
-            customer_stats[customer_id]['total_spent'] += transaction_amount
-            customer_stats[customer_id]['purchase_count'] += 1
+            bucket = customers[customer_id]
+            bucket[0] += transaction['Quantity'] * transaction['UnitPrice']
+            bucket[1] += 1
+            product_name = transaction['ProductName']
             if product_name:
-                customer_stats[customer_id]['products_bought'].add(product_name)
-            
-        except (ValueError, TypeError, KeyError):
-            # Skip transactions with invalid data
-            continue
+                bucket[2].add(product_name)
+    except (KeyError, TypeError) as e:
+        raise _malformed_transaction_error(transactions, ('CustomerID', 'ProductName') + _NUMERIC_FIELDS, e) from e
+    
+    customer_stats = {
+        customer_id: {
+            'total_spent': spent,
+            'purchase_count': count,
+            'products_bought': products
+        }
+        for customer_id, (spent, count, products) in customers.items()
+    }
     
     # Calculate average order value and convert set to sorted list
     for customer_id, stats in customer_stats.items():
@@ -491,7 +924,7 @@ def customer_analysis(transactions):
             stats['avg_order_value'] = 0.0
         
         # Convert products_bought set to sorted list
-        stats['products_bought'] = sorted(list(stats['products_bought']))
+        stats['products_bought'] = sorted(stats['products_bought'])
     
     # Sort by total_spent in descending order
     # Convert to list of tuples, sort, then convert back to dict
@@ -509,6 +942,50 @@ def customer_analysis(transactions):
     return result
 
 
+def customer_analysis_arr(customer, product, amounts):
+    """
+    Analyzes customer purchase patterns from columnar data
+
+    Parameters:
+    - customer: (codes, labels) pair from build_columns()['CustomerID']
+    - product: (codes, labels) pair from build_columns()['ProductName']
+    - amounts: build_columns()['Amount']
+
+    Returns: dictionary of customer statistics (same format as customer_analysis)
+    """
+    customer_codes, customer_labels = customer
+    product_codes, product_labels = product
+    n_customers = len(customer_labels)
+
+    total_spent = _bincount(customer_codes, n_customers, weights=amounts)
+    purchase_count = _bincount(customer_codes, n_customers)
+
+    # Unique product codes per customer
+    products_bought = [set() for _ in range(n_customers)]
+    for customer_code, product_code in zip(customer_codes, product_codes):
+        products_bought[customer_code].add(product_code)
+
+    # Sort by total_spent in descending order (stable, like customer_analysis)
+    order = sorted(
+        (i for i in range(n_customers) if customer_labels[i]),
+        key=total_spent.__getitem__,
+        reverse=True
+    )
+
+    result = {}
+    for i in order:
+        result[customer_labels[i]] = {
+            'total_spent': total_spent[i],
+            'purchase_count': purchase_count[i],
+            'products_bought': sorted(
+                product_labels[code] for code in products_bought[i] if product_labels[code]
+            ),
+            'avg_order_value': round(total_spent[i] / purchase_count[i], 2)
+        }
+
+    return result
+
+
 def daily_sales_trend(transactions):
     """
     Analyzes sales trends by date
@@ -531,78 +1008,96 @@ def daily_sales_trend(transactions):
     - Count daily transactions
     - Count unique customers per day
     - Sort chronologically
+
+    Raises ValueError if a transaction lacks Date, CustomerID, Quantity or
+    UnitPrice, or Quantity/UnitPrice is not a number.
     """
-    # Dictionary to store daily statistics
-    daily_stats = {}
+    # One list-backed bucket per date: [revenue, transaction_count, customers]
+    daily = defaultdict(lambda: [0.0, 0, set()])
     
     # Process each transaction
-    for transaction in transactions:
-        try:
-            date = transaction.get('Date', '').strip()
+    try:
+        for transaction in transactions:
+            date = transaction['Date']
             if not date:
                 continue
             
-            customer_id = transaction.get('CustomerID', '').strip()
-            quantity = transaction.get('Quantity', 0)
-            unit_price = transaction.get('UnitPrice', 0.0)
-            
-            # Ensure quantity and unit_price are numeric
-            if isinstance(quantity, str):
-                quantity = int(float(quantity.replace(',', '')))
-            if isinstance(unit_price, str):
-                unit_price = float(unit_price.replace(',', ''))
-            
-            # Calculate transaction revenue
-            revenue = quantity * unit_price
-            
-            # Initialize date if not exists
-            if date not in daily_stats:
-                daily_stats[date] = {
-                    'revenue': 0.0,
-                    'transaction_count': 0,
-                    'unique_customers': set()
-                }
-            
             # Update daily statistics
-            daily_stats[date]['revenue'] += revenue
-            daily_stats[date]['transaction_count'] += 1
+            bucket = daily[date]
+            bucket[0] += transaction['Quantity'] * transaction['UnitPrice']
+            bucket[1] += 1
+            customer_id = transaction['CustomerID']
             if customer_id:
-                daily_stats[date]['unique_customers'].add(customer_id)
-            
-        except (ValueError, TypeError, KeyError):
-            # Skip transactions with invalid data
-            continue
+                bucket[2].add(customer_id)
+    except (KeyError, TypeError) as e:
+        raise _malformed_transaction_error(transactions, ('Date', 'CustomerID') + _NUMERIC_FIELDS, e) from e
     
     # Convert set to count and sort chronologically
     result = {}
-    for date in sorted(daily_stats.keys()):  # Sort chronologically
-        stats = daily_stats[date]
+    for date in sorted(daily):  # Sort chronologically
+        revenue, transaction_count, customers = daily[date]
         result[date] = {
-            'revenue': stats['revenue'],
-            'transaction_count': stats['transaction_count'],
-            'unique_customers': len(stats['unique_customers'])
+            'revenue': revenue,
+            'transaction_count': transaction_count,
+            'unique_customers': len(customers)
         }
     
     return result
 
 
-def find_peak_sales_day(transactions):
+def daily_sales_trend_arr(date, customer, amounts):
+    """
+    Analyzes sales trends by date from columnar data
+
+    Parameters:
+    - date: (codes, labels) pair from build_columns()['Date']
+    - customer: (codes, labels) pair from build_columns()['CustomerID']
+    - amounts: build_columns()['Amount']
+
+    Returns: dictionary sorted by date (same format as daily_sales_trend)
+    """
+    date_codes, date_labels = date
+    customer_codes, customer_labels = customer
+    n_dates = len(date_labels)
+
+    revenue = _bincount(date_codes, n_dates, weights=amounts)
+    counts = _bincount(date_codes, n_dates)
+
+    unique_customers = _unique_per_group(date_codes, customer_codes, n_dates, customer_labels)
+
+    result = {}
+    for i in sorted(range(n_dates), key=date_labels.__getitem__):  # Sort chronologically
+        if not date_labels[i]:
+            continue
+        result[date_labels[i]] = {
+            'revenue': revenue[i],
+            'transaction_count': counts[i],
+            'unique_customers': unique_customers[i]
+        }
+
+    return result
+
+
+def find_peak_sales_day(transactions, daily_stats=None):
     """
     Identifies the date with highest revenue
     Returns: tuple (date, revenue, transaction_count)
     
     Expected Output Format:
     ('2024-12-15', 185000.0, 12)
+
+    daily_stats may be passed in when daily_sales_trend() has already been
+    computed for the same transactions.
     """
     # Use daily_sales_trend to get daily statistics
-    daily_stats = daily_sales_trend(transactions)
+    if daily_stats is None:
+        daily_stats = daily_sales_trend(transactions)
     
     if not daily_stats:
         return (None, 0.0, 0)
     
     # Find the date with maximum revenue
-    peak_date = max(daily_stats.keys(), key=lambda d: daily_stats[d]['revenue'])
-    peak_stats = daily_stats[peak_date]
+    peak_date, peak_stats = max(daily_stats.items(), key=lambda item: item[1]['revenue'])
     
     return (
         peak_date,
@@ -611,7 +1106,7 @@ def find_peak_sales_day(transactions):
     )
 
 
-def low_performing_products(transactions, threshold=10):
+def low_performing_products(transactions, threshold=10, product_totals=None):
     """
     Identifies products with low sales
 
@@ -628,50 +1123,22 @@ def low_performing_products(transactions, threshold=10):
     - Find products with total quantity < threshold
     - Include total quantity and revenue
     - Sort by TotalQuantity ascending
+
+    product_totals may be passed in when _aggregate_products() has already
+    been computed for the same transactions.
+
+    Raises ValueError on a malformed transaction, as top_selling_products().
     """
-    # Dictionary to aggregate product data
-    product_stats = {}
-    
-    # Process each transaction
-    for transaction in transactions:
-        try:
-            product_name = transaction.get('ProductName', '').strip()
-            if not product_name:
-                continue
-            
-            quantity = transaction.get('Quantity', 0)
-            unit_price = transaction.get('UnitPrice', 0.0)
-            
-            # Ensure quantity and unit_price are numeric
-            if isinstance(quantity, str):
-                quantity = int(float(quantity.replace(',', '')))
-            if isinstance(unit_price, str):
-                unit_price = float(unit_price.replace(',', ''))
-            
-            # Initialize product if not exists
-            if product_name not in product_stats:
-                product_stats[product_name] = {
-                    'total_quantity': 0,
-                    'total_revenue': 0.0
-                }
-            
-            # Aggregate quantities and revenue
-            product_stats[product_name]['total_quantity'] += quantity
-            product_stats[product_name]['total_revenue'] += quantity * unit_price
-            
-        except (ValueError, TypeError, KeyError):
-            # Skip transactions with invalid data
-            continue
+    if product_totals is None:
+        product_totals = _aggregate_products(transactions)
+    total_quantity, total_revenue = product_totals
     
     # Filter products with total quantity < threshold
-    low_performers = []
-    for product_name, stats in product_stats.items():
-        if stats['total_quantity'] < threshold:
-            low_performers.append((
-                product_name,
-                stats['total_quantity'],
-                stats['total_revenue']
-            ))
+    low_performers = [
+        (product_name, quantity, total_revenue[product_name])
+        for product_name, quantity in total_quantity.items()
+        if quantity < threshold
+    ]
     
     # Sort by TotalQuantity ascending
     low_performers.sort(key=lambda x: x[1])
@@ -679,71 +1146,102 @@ def low_performing_products(transactions, threshold=10):
     return low_performers
 
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+def low_performing_products_arr(product, quantities, amounts, threshold=10, product_totals=None):
     """
-    Generates a comprehensive formatted text report
+    Identifies products with low sales from columnar data
 
-    Report Must Include (in this order):
+    Parameters:
+    - product: (codes, labels) pair from build_columns()['ProductName']
+    - quantities: build_columns()['Quantity']
+    - amounts: build_columns()['Amount']
+    - threshold: same as low_performing_products()
+    - product_totals: _aggregate_by_code() result for these columns, if already computed (optional)
 
-    1. HEADER
-       - Report title
-       - Generation date and time
-       - Total records processed
+    Returns: list of tuples (same format as low_performing_products)
+    """
+    codes, labels = product
+    if product_totals is None:
+        product_totals = _aggregate_by_code(codes, quantities, amounts, len(labels))
+    total_quantity, total_revenue = product_totals
 
-    2. OVERALL SUMMARY
-       - Total Revenue (formatted with commas)
-       - Total Transactions
-       - Average Order Value
-       - Date Range of data
+    low_performers = [
+        (labels[i], total_quantity[i], total_revenue[i])
+        for i in range(len(labels))
+        if labels[i] and total_quantity[i] < threshold
+    ]
 
-    3. REGION-WISE PERFORMANCE
-       - Table showing each region with:
-         * Total Sales Amount
-         * Percentage of Total
-         * Transaction Count
-       - Sorted by sales amount descending
+    # Sort by TotalQuantity ascending (stable, like low_performing_products)
+    low_performers.sort(key=lambda x: x[1])
 
-    4. TOP 5 PRODUCTS
-       - Table with columns: Rank, Product Name, Quantity Sold, Revenue
+    return low_performers
 
-    5. TOP 5 CUSTOMERS
-       - Table with columns: Rank, Customer ID, Total Spent, Order Count
 
-    6. DAILY SALES TREND
-       - Table showing: Date, Revenue, Transactions, Unique Customers
+def _report_analytics(transactions, columns=None):
+    """
+    Runs the analyses used by the sales report
+    Returns: tuple (total_revenue, dates, region_stats, top_products,
+                    customer_stats, daily_trend, peak_day, low_performers)
 
-    7. PRODUCT PERFORMANCE ANALYSIS
-       - Best selling day
-       - Low performing products (if any)
-       - Average transaction value per region
+    With columns (build_columns(transactions)) the columnar variants are used;
+    otherwise the row-wise functions are.
+    """
+    if columns is not None:
+        amounts = columns['Amount']
+        total_revenue = calculate_total_revenue_arr(columns['Quantity'], columns['UnitPrice'])
+        dates = [date for date in columns['Date'][1] if date]
+        region_stats = region_wise_sales_arr(columns['Region'], amounts, total_revenue=total_revenue)
+        product_codes, product_labels = columns['ProductName']
+        product_totals = _aggregate_by_code(product_codes, columns['Quantity'], amounts, len(product_labels))
+        top_products = top_selling_products_arr(columns['ProductName'], columns['Quantity'], amounts, n=5,
+                                                product_totals=product_totals)
+        customer_stats = customer_analysis_arr(columns['CustomerID'], columns['ProductName'], amounts)
+        daily_trend = daily_sales_trend_arr(columns['Date'], columns['CustomerID'], amounts)
+        low_performers = low_performing_products_arr(columns['ProductName'], columns['Quantity'], amounts,
+                                                     threshold=10, product_totals=product_totals)
+    else:
+        total_revenue = calculate_total_revenue(transactions)
+        dates = [t.get('Date', '') for t in transactions if t.get('Date')]
+        region_stats = region_wise_sales(transactions, total_revenue=total_revenue)
+        product_totals = _aggregate_products(transactions)
+        top_products = top_selling_products(transactions, n=5, product_totals=product_totals)
+        customer_stats = customer_analysis(transactions)
+        daily_trend = daily_sales_trend(transactions)
+        low_performers = low_performing_products(transactions, threshold=10, product_totals=product_totals)
+    
+    peak_day = find_peak_sales_day(transactions, daily_stats=daily_trend)
+    
+    return (total_revenue, dates, region_stats, top_products,
+            customer_stats, daily_trend, peak_day, low_performers)
 
-    8. API ENRICHMENT SUMMARY
-       - Total products enriched
-       - Success rate percentage
-       - List of products that couldn't be enriched
+
+def iter_sales_report(transactions, enriched_transactions, columns=None):
     """
-    import os
-    
-    # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    report_lines = []
+    Yields the sales report of generate_sales_report() one section at a time
+    Returns: generator of text blocks; concatenated they form the full report
+
+    Each section is built as one preformatted block (a single join per
+    section), so the report can be written out without ever holding it as
+    one string. Pass columns (build_columns(transactions)) to run the
+    analyses on the columnar view.
+    """
+    (total_revenue, dates, region_stats, top_products,
+     customer_stats, daily_trend, peak_day, low_performers) = _report_analytics(transactions, columns)
     
     # 1. HEADER
-    report_lines.append("=" * 50)
-    report_lines.append("     SALES ANALYTICS REPORT")
-    report_lines.append(f"  Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report_lines.append(f"  Records Processed: {len(transactions)}")
-    report_lines.append("=" * 50)
-    report_lines.append("")
+    header_block = (
+        f"{_REPORT_TITLE}"
+        f"  Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"  Records Processed: {len(transactions)}\n"
+        f"{_EQ}\n"
+    )
+    
+    yield f"{header_block}\n"
     
     # 2. OVERALL SUMMARY
-    total_revenue = calculate_total_revenue(transactions)
     total_transactions = len(transactions)
     avg_order_value = total_revenue / total_transactions if total_transactions > 0 else 0
     
     # Get date range
-    dates = [t.get('Date', '') for t in transactions if t.get('Date')]
     if dates:
         min_date = min(dates)
         max_date = max(dates)
@@ -751,145 +1249,216 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
     else:
         date_range = "N/A"
     
-    report_lines.append("OVERALL SUMMARY")
-    report_lines.append("-" * 50)
-    report_lines.append(f"Total Revenue:        ₹{total_revenue:,.2f}")
-    report_lines.append(f"Total Transactions:   {total_transactions}")
-    report_lines.append(f"Average Order Value:  ₹{avg_order_value:,.2f}")
-    report_lines.append(f"Date Range:           {date_range}")
-    report_lines.append("")
+    summary_block = (
+        "OVERALL SUMMARY\n"
+        f"{_DASH}\n"
+        f"Total Revenue:        ₹{total_revenue:,.2f}\n"
+        f"Total Transactions:   {total_transactions}\n"
+        f"Average Order Value:  ₹{avg_order_value:,.2f}\n"
+        f"Date Range:           {date_range}\n"
+    )
     
-    # 3. REGION-WISE PERFORMANCE
-    region_stats = region_wise_sales(transactions)
-    report_lines.append("REGION-WISE PERFORMANCE")
-    report_lines.append("-" * 50)
-    report_lines.append(f"{'Region':<12} {'Sales':<15} {'% of Total':<12} {'Transactions':<12}")
-    report_lines.append("-" * 50)
+    yield f"{summary_block}\n"
     
-    for region, stats in region_stats.items():
-        sales = stats['total_sales']
-        percentage = stats['percentage']
-        count = stats['transaction_count']
-        report_lines.append(f"{region:<12} ₹{sales:>12,.2f}  {percentage:>6.2f}%      {count:>10}")
-    report_lines.append("")
+    # 3. REGION-WISE PERFORMANCE
+    region_block = "\n".join([
+        "REGION-WISE PERFORMANCE",
+        _DASH,
+        f"{'Region':<12} {'Sales':<15} {'% of Total':<12} {'Transactions':<12}",
+        _DASH,
+        *(f"{region:<12} ₹{stats['total_sales']:>12,.2f}  {stats['percentage']:>6.2f}%      {stats['transaction_count']:>10}"
+          for region, stats in region_stats.items()),
+        ""
+    ])
+    
+    yield f"{region_block}\n"
     
     # 4. TOP 5 PRODUCTS
-    top_products = top_selling_products(transactions, n=5)
-    report_lines.append("TOP 5 PRODUCTS")
-    report_lines.append("-" * 50)
-    report_lines.append(f"{'Rank':<6} {'Product Name':<25} {'Quantity Sold':<15} {'Revenue':<15}")
-    report_lines.append("-" * 50)
-    
-    for rank, (product_name, quantity, revenue) in enumerate(top_products, 1):
-        report_lines.append(f"{rank:<6} {product_name:<25} {quantity:>13}      ₹{revenue:>12,.2f}")
-    report_lines.append("")
+    products_block = "\n".join([
+        "TOP 5 PRODUCTS",
+        _DASH,
+        f"{'Rank':<6} {'Product Name':<25} {'Quantity Sold':<15} {'Revenue':<15}",
+        _DASH,
+        *(f"{rank:<6} {product_name:<25} {quantity:>13}      ₹{revenue:>12,.2f}"
+          for rank, (product_name, quantity, revenue) in enumerate(top_products, 1)),
+        ""
+    ])
+    
+    yield f"{products_block}\n"
     
     # 5. TOP 5 CUSTOMERS
-    customer_stats = customer_analysis(transactions)
-    top_customers = list(customer_stats.items())[:5]
-    report_lines.append("TOP 5 CUSTOMERS")
-    report_lines.append("-" * 50)
-    report_lines.append(f"{'Rank':<6} {'Customer ID':<15} {'Total Spent':<15} {'Order Count':<12}")
-    report_lines.append("-" * 50)
-    
-    for rank, (customer_id, stats) in enumerate(top_customers, 1):
-        total_spent = stats['total_spent']
-        order_count = stats['purchase_count']
-        report_lines.append(f"{rank:<6} {customer_id:<15} ₹{total_spent:>12,.2f}  {order_count:>10}")
-    report_lines.append("")
-    
-    # 6. DAILY SALES TREND
-    daily_trend = daily_sales_trend(transactions)
-    report_lines.append("DAILY SALES TREND")
-    report_lines.append("-" * 50)
-    report_lines.append(f"{'Date':<12} {'Revenue':<15} {'Transactions':<12} {'Unique Customers':<15}")
-    report_lines.append("-" * 50)
-    
-    # Show first 10 days
-    for date, stats in list(daily_trend.items())[:10]:
-        revenue = stats['revenue']
-        tx_count = stats['transaction_count']
-        customers = stats['unique_customers']
-        report_lines.append(f"{date:<12} ₹{revenue:>12,.2f}  {tx_count:>10}      {customers:>13}")
-    
-    if len(daily_trend) > 10:
-        report_lines.append(f"... and {len(daily_trend) - 10} more days")
-    report_lines.append("")
+    # customer_stats is already sorted by total_spent; take the first 5 without copying the rest
+    top_customers = islice(customer_stats.items(), 5)
+    customers_block = "\n".join([
+        "TOP 5 CUSTOMERS",
+        _DASH,
+        f"{'Rank':<6} {'Customer ID':<15} {'Total Spent':<15} {'Order Count':<12}",
+        _DASH,
+        *(f"{rank:<6} {customer_id:<15} ₹{stats['total_spent']:>12,.2f}  {stats['purchase_count']:>10}"
+          for rank, (customer_id, stats) in enumerate(top_customers, 1)),
+        ""
+    ])
+    
+    yield f"{customers_block}\n"
+    
+    # 6. DAILY SALES TREND (first 10 days)
+    more_days = [f"... and {len(daily_trend) - 10} more days"] if len(daily_trend) > 10 else []
+    daily_block = "\n".join([
+        "DAILY SALES TREND",
+        _DASH,
+        f"{'Date':<12} {'Revenue':<15} {'Transactions':<12} {'Unique Customers':<15}",
+        _DASH,
+        *(f"{date:<12} ₹{stats['revenue']:>12,.2f}  {stats['transaction_count']:>10}      {stats['unique_customers']:>13}"
+          for date, stats in islice(daily_trend.items(), 10)),
+        *more_days,
+        ""
+    ])
+    
+    yield f"{daily_block}\n"
     
     # 7. PRODUCT PERFORMANCE ANALYSIS
-    peak_day = find_peak_sales_day(transactions)
-    low_performers = low_performing_products(transactions, threshold=10)
-    
     # Calculate average transaction value per region
     region_avg = {}
     for region, stats in region_stats.items():
         if stats['transaction_count'] > 0:
             region_avg[region] = stats['total_sales'] / stats['transaction_count']
     
-    report_lines.append("PRODUCT PERFORMANCE ANALYSIS")
-    report_lines.append("-" * 50)
-    report_lines.append(f"Best Selling Day: {peak_day[0]}")
-    report_lines.append(f"  Revenue: ₹{peak_day[1]:,.2f}")
-    report_lines.append(f"  Transactions: {peak_day[2]}")
-    report_lines.append("")
-    
     if low_performers:
-        report_lines.append("Low Performing Products (Quantity < 10):")
-        for product_name, quantity, revenue in low_performers[:5]:
-            report_lines.append(f"  - {product_name}: {quantity} units, ₹{revenue:,.2f}")
+        low_lines = ["Low Performing Products (Quantity < 10):"]
+        low_lines.extend(f"  - {product_name}: {quantity} units, ₹{revenue:,.2f}"
+                         for product_name, quantity, revenue in low_performers[:5])
     else:
-        report_lines.append("Low Performing Products: None")
-    report_lines.append("")
-    
-    report_lines.append("Average Transaction Value per Region:")
-    for region, avg_value in sorted(region_avg.items(), key=lambda x: x[1], reverse=True):
-        report_lines.append(f"  {region}: ₹{avg_value:,.2f}")
-    report_lines.append("")
+        low_lines = ["Low Performing Products: None"]
+    
+    performance_block = "\n".join([
+        "PRODUCT PERFORMANCE ANALYSIS",
+        _DASH,
+        f"Best Selling Day: {peak_day[0]}",
+        f"  Revenue: ₹{peak_day[1]:,.2f}",
+        f"  Transactions: {peak_day[2]}",
+        "",
+        *low_lines,
+        "",
+        "Average Transaction Value per Region:",
+        *(f"  {region}: ₹{avg_value:,.2f}"
+          for region, avg_value in sorted(region_avg.items(), key=lambda x: x[1], reverse=True)),
+        ""
+    ])
+    
+    yield f"{performance_block}\n"
     
     # 8. API ENRICHMENT SUMMARY
     if enriched_transactions:
         total_enriched = len(enriched_transactions)
-        successful = sum(1 for t in enriched_transactions if t.get('API_Match') == True)
+        match_counts = Counter(t.get('API_Match') for t in enriched_transactions)
+        successful = match_counts[True]
         failed = total_enriched - successful
         success_rate = (successful / total_enriched * 100) if total_enriched > 0 else 0
         
         # Get list of products that couldn't be enriched
-        failed_products = set()
-        for t in enriched_transactions:
-            if t.get('API_Match') == False:
-                failed_products.add(t.get('ProductID', 'Unknown'))
+        failed_products = {t.get('ProductID', 'Unknown') for t in enriched_transactions
+                           if t.get('API_Match') == False}
         
-        report_lines.append("API ENRICHMENT SUMMARY")
-        report_lines.append("-" * 50)
-        report_lines.append(f"Total Products Enriched: {total_enriched}")
-        report_lines.append(f"Success Rate: {success_rate:.2f}%")
-        report_lines.append(f"Successfully Enriched: {successful}")
-        report_lines.append(f"Failed to Enrich: {failed}")
+        enrichment_lines = [
+            "API ENRICHMENT SUMMARY",
+            _DASH,
+            f"Total Products Enriched: {total_enriched}",
+            f"Success Rate: {success_rate:.2f}%",
+            f"Successfully Enriched: {successful}",
+            f"Failed to Enrich: {failed}"
+        ]
         
         if failed_products:
-            report_lines.append("")
-            report_lines.append("Products That Couldn't Be Enriched:")
-            for product_id in sorted(failed_products)[:10]:
-                report_lines.append(f"  - {product_id}")
+            enrichment_lines.append("")
+            enrichment_lines.append("Products That Couldn't Be Enriched:")
+            enrichment_lines.extend(f"  - {product_id}" for product_id in sorted(failed_products)[:10])
             if len(failed_products) > 10:
-                report_lines.append(f"  ... and {len(failed_products) - 10} more")
+                enrichment_lines.append(f"  ... and {len(failed_products) - 10} more")
+        enrichment_block = "\n".join(enrichment_lines)
     else:
-        report_lines.append("API ENRICHMENT SUMMARY")
-        report_lines.append("-" * 50)
-        report_lines.append("No enriched transaction data available")
+        enrichment_block = (
+            "API ENRICHMENT SUMMARY\n"
+            f"{_DASH}\n"
+            "No enriched transaction data available"
+        )
+    
+    yield (
+        f"{enrichment_block}\n"
+        "\n"
+        f"{_EQ}\n"
+        "End of Report\n"
+        f"{_EQ}"
+    )
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt',
+                          columns=None):
+    """
+    Generates a comprehensive formatted text report
+    Returns: True if the report file was written, False otherwise
+
+    columns: optional build_columns(transactions), reused for the analyses
+
+    Report Must Include (in this order):
+
+    1. HEADER
+       - Report title
+       - Generation date and time
+       - Total records processed
+
+    2. OVERALL SUMMARY
+       - Total Revenue (formatted with commas)
+       - Total Transactions
+       - Average Order Value
+       - Date Range of data
+
+    3. REGION-WISE PERFORMANCE
+       - Table showing each region with:
+         * Total Sales Amount
+         * Percentage of Total
+         * Transaction Count
+       - Sorted by sales amount descending
+
+    4. TOP 5 PRODUCTS
+       - Table with columns: Rank, Product Name, Quantity Sold, Revenue
+
+    5. TOP 5 CUSTOMERS
+       - Table with columns: Rank, Customer ID, Total Spent, Order Count
+
+    6. DAILY SALES TREND
+       - Table showing: Date, Revenue, Transactions, Unique Customers
+
+    7. PRODUCT PERFORMANCE ANALYSIS
+       - Best selling day
+       - Low performing products (if any)
+       - Average transaction value per region
+
+    8. API ENRICHMENT SUMMARY
+       - Total products enriched
+       - Success rate percentage
+       - List of products that couldn't be enriched
+    """
+    import os
     
-    report_lines.append("")
-    report_lines.append("=" * 50)
-    report_lines.append("End of Report")
-    report_lines.append("=" * 50)
+    # Create output directory if it doesn't exist
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
     
-    # Write to file
+    # Stream the sections into a temporary file next to the report and only
+    # replace the existing report once every section has been written
+    temp_file = f"{output_file}.tmp"
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(report_lines))
+        with open(temp_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(iter_sales_report(transactions, enriched_transactions, columns))
+        os.replace(temp_file, output_file)
         print(f"✓ Sales report generated successfully: {output_file}")
+        return True
     except Exception as e:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
         print(f"✗ Error generating report: {str(e)}")
+        return False
 
 
 def clean_product_name(product_name: str) -> str:
@@ -918,32 +1487,78 @@ def clean_numeric_value(value: str) -> float:
     return float(value.replace(',', ''))
 
 
-def clean_and_validate_data(raw_lines: List[str]) -> Tuple[List[Dict], List[Dict], int, int]:
+def validate_record(record: Dict) -> Tuple[bool, str, Optional[Dict]]:
+    """
+    Validate a raw (string-valued) sales record.
+    
+    Args:
+        record: Record dictionary as split from a data line
+    
+    Returns:
+        Tuple of (is_valid, error_msg, parsed); error_msg is '' for valid
+        records and parsed holds the numbers read while validating,
+        {'quantity': float, 'unit_price': float} (None for invalid records)
+    
+    A record is invalid if CustomerID or Region is missing, TransactionID does
+    not start with 'T', or Quantity/UnitPrice is not a number greater than 0.
+    """
+    get = record.get
+    
+    if not get('CustomerID'):
+        return False, 'Missing CustomerID', None
+    if not get('Region'):
+        return False, 'Missing Region', None
+    if str(get('TransactionID', ''))[:1] != 'T':
+        return False, "TransactionID must start with 'T'", None
+    
+    # Numbers are checked against the precompiled pattern, so float() cannot fail
+    quantity_str = str(get('Quantity', ''))
+    if not _NUMBER_RE.fullmatch(quantity_str):
+        return False, 'Invalid Quantity format', None
+    quantity = float(quantity_str.replace(',', ''))
+    if quantity <= 0:
+        return False, 'Quantity must be greater than 0', None
+    
+    unit_price_str = str(get('UnitPrice', ''))
+    if not _NUMBER_RE.fullmatch(unit_price_str):
+        return False, 'Invalid UnitPrice format', None
+    unit_price = float(unit_price_str.replace(',', ''))
+    if unit_price <= 0:
+        return False, 'UnitPrice must be greater than 0', None
+    
+    return True, '', {'quantity': quantity, 'unit_price': unit_price}
+
+
+def clean_and_validate_data(raw_lines: Iterable[str]) -> Tuple[List[Dict], List[Dict], int, int]:
     """
     Clean and validate sales data from raw file lines.
     
     Args:
-        raw_lines: List of lines from the sales data file
+        raw_lines: Lines of the sales data file, header first (a list or any
+            iterable, e.g. an open file, which is consumed in one pass).
+            A leading BOM on the header is ignored; files opened with
+            encoding='utf-8-sig' never pass one in.
     
     Returns:
         Tuple of (valid_records, invalid_records, total_parsed, invalid_count)
     """
-    if not raw_lines:
+    lines = iter(raw_lines)
+    header_line = next(lines, None)
+    if header_line is None:
         return [], [], 0, 0
     
-    # Parse header (strip BOM if present)
-    header_line = raw_lines[0].strip()
-    # Remove BOM (Byte Order Mark) if present
-    if header_line.startswith('\ufeff'):
-        header_line = header_line[1:]
+    # Parse header (strip surrounding whitespace and a BOM if present)
+    header_line = header_line.strip().lstrip('\ufeff')
     headers = [h.strip() for h in header_line.split('|')]
+    header_count = len(headers)
+    has_product_name = 'ProductName' in headers
     
     valid_records = []
     invalid_records = []
     total_parsed = 0
     
     # Process each data line
-    for line in raw_lines[1:]:
+    for line in lines:
         line = line.strip()
         
         # Skip empty lines
@@ -955,46 +1570,26 @@ def clean_and_validate_data(raw_lines: List[str]) -> Tuple[List[Dict], List[Dict
         # Split by pipe delimiter
         fields = [f.strip() for f in line.split('|')]
         
-        # Create record dictionary
-        record = {}
-        for i, header in enumerate(headers):
-            if i < len(fields):
-                record[header] = fields[i]
-            else:
-                record[header] = ''
+        # Create record dictionary (missing trailing fields become '', extra ones are dropped)
+        if len(fields) < header_count:
+            fields.extend([''] * (header_count - len(fields)))
+        record = dict(zip(headers, fields))
         
-        # Clean ProductName (remove commas)
-        if 'ProductName' in record:
-            record['ProductName'] = clean_product_name(record['ProductName'])
+        # Clean ProductName (remove commas, as clean_product_name() does)
+        if has_product_name:
+            record['ProductName'] = record['ProductName'].replace(',', '')
         
-        # Validate record first (before cleaning numeric fields)
-        is_valid, error_msg = validate_record(record)
+        # Validate record first; it also parses the numeric fields
+        is_valid, error_msg, parsed = validate_record(record)
         
         if is_valid:
-            # Clean numeric fields (remove commas and convert to proper types)
-            try:
-                quantity_str = record['Quantity']
-                if ',' in quantity_str:
-                    record['Quantity'] = int(clean_numeric_value(quantity_str))
-                else:
-                    record['Quantity'] = int(float(quantity_str))
-            except (ValueError, AttributeError, TypeError):
-                invalid_records.append({**record, 'Error': 'Invalid Quantity format'})
-                continue
-            
-            try:
-                unit_price_str = record['UnitPrice']
-                if ',' in unit_price_str:
-                    record['UnitPrice'] = float(clean_numeric_value(unit_price_str))
-                else:
-                    record['UnitPrice'] = float(unit_price_str)
-            except (ValueError, AttributeError, TypeError):
-                invalid_records.append({**record, 'Error': 'Invalid UnitPrice format'})
-                continue
-            
+            # Store the already-parsed numbers with their proper types
+            record['Quantity'] = int(parsed['quantity'])
+            record['UnitPrice'] = parsed['unit_price']
             valid_records.append(record)
         else:
-            invalid_records.append({**record, 'Error': error_msg})
+            record['Error'] = error_msg
+            invalid_records.append(record)
     
     invalid_count = len(invalid_records)
     
@@ -1021,37 +1616,76 @@ def calculate_sales_statistics(valid_records: List[Dict]) -> Dict:
             'top_customer': None
         }
     
-    # Calculate total revenue
-    total_revenue = sum(record['Quantity'] * record['UnitPrice'] for record in valid_records)
-    total_transactions = len(valid_records)
-    average_transaction_value = total_revenue / total_transactions if total_transactions > 0 else 0
+    # Accumulate total revenue and the per-product/region/customer revenue in one pass
+    total_revenue = 0
+    product_revenue = defaultdict(int)
+    region_revenue = defaultdict(int)
+    customer_revenue = defaultdict(int)
     
-    # Find top product by revenue
-    product_revenue = {}
     for record in valid_records:
-        product = record.get('ProductName', 'Unknown')
         revenue = record['Quantity'] * record['UnitPrice']
-        product_revenue[product] = product_revenue.get(product, 0) + revenue
-    
-    top_product = max(product_revenue.items(), key=lambda x: x[1]) if product_revenue else (None, 0)
-    
-    # Find top region by revenue
-    region_revenue = {}
-    for record in valid_records:
-        region = record.get('Region', 'Unknown')
-        revenue = record['Quantity'] * record['UnitPrice']
-        region_revenue[region] = region_revenue.get(region, 0) + revenue
+        total_revenue += revenue
+        product_revenue[record.get('ProductName', 'Unknown')] += revenue
+        region_revenue[record.get('Region', 'Unknown')] += revenue
+        customer_revenue[record.get('CustomerID', 'Unknown')] += revenue
+    
+    # Return plain dicts (missing keys should not be created on lookup)
+    product_revenue = dict(product_revenue)
+    region_revenue = dict(region_revenue)
+    customer_revenue = dict(customer_revenue)
+    
+    return _sales_statistics_result(total_revenue, len(valid_records),
+                                    product_revenue, region_revenue, customer_revenue)
+
+
+def calculate_sales_statistics_arr(columns: Dict) -> Dict:
+    """
+    Calculate sales statistics from columnar data.
     
-    top_region = max(region_revenue.items(), key=lambda x: x[1]) if region_revenue else (None, 0)
+    Args:
+        columns: build_columns() output for the valid records
     
-    # Find top customer by revenue
-    customer_revenue = {}
-    for record in valid_records:
-        customer = record.get('CustomerID', 'Unknown')
-        revenue = record['Quantity'] * record['UnitPrice']
-        customer_revenue[customer] = customer_revenue.get(customer, 0) + revenue
+    Returns:
+        Dictionary containing various sales statistics
+        (same format as calculate_sales_statistics)
+    """
+    amounts = columns['Amount']
+    if not amounts:
+        return calculate_sales_statistics([])
+    
+    def revenue_by(column):
+        codes, labels = column
+        return dict(zip(labels, _bincount(codes, len(labels), weights=amounts)))
+    
+    return _sales_statistics_result(sum(amounts), len(amounts),
+                                    revenue_by(columns['ProductName']),
+                                    revenue_by(columns['Region']),
+                                    revenue_by(columns['CustomerID']))
+
+
+def _top_item(totals):
+    """
+    Finds the key with the largest value (first one on ties)
+    Returns: tuple (key, value), or (None, 0) for an empty dict
+    """
+    if not totals:
+        return (None, 0)
+    # Keys only, with a C-level key function: no per-item tuples or lambda calls
+    top_key = max(totals, key=totals.__getitem__)
+    return (top_key, totals[top_key])
+
+
+def _sales_statistics_result(total_revenue, total_transactions,
+                             product_revenue, region_revenue, customer_revenue):
+    """
+    Builds the calculate_sales_statistics() result from the revenue totals
+    """
+    average_transaction_value = total_revenue / total_transactions if total_transactions > 0 else 0
     
-    top_customer = max(customer_revenue.items(), key=lambda x: x[1]) if customer_revenue else (None, 0)
+    # Find top product, region and customer by revenue
+    top_product = _top_item(product_revenue)
+    top_region = _top_item(region_revenue)
+    top_customer = _top_item(customer_revenue)
     
     result = {
         'total_revenue': total_revenue,
@@ -1065,4 +1699,3 @@ def calculate_sales_statistics(valid_records: List[Dict]) -> Dict:
         'customer_revenue': customer_revenue
     }
     return result
-
@@ -3,7 +3,9 @@ File handler module for reading and writing files.
 Handles encoding issues and file operations.
 """
 
+import mmap
 import os
+from itertools import islice
 from typing import List, Optional
 
 
@@ -21,33 +23,47 @@ def read_sales_data(filename):
     - Handle FileNotFoundError with appropriate error message
     - Skip the header row
     - Remove empty lines
+
+    The file is memory-mapped once and decoded straight from the mapping, so
+    an encoding retry does not re-read the file and no per-line buffer is built.
     """
-    encodings = ['utf-8', 'latin-1', 'cp1252']
+    # 'utf-8-sig' is UTF-8 that also drops a leading BOM while decoding
+    encodings = ['utf-8-sig', 'latin-1', 'cp1252']
     
-    for encoding in encodings:
-        try:
-            with open(filename, 'r', encoding=encoding) as file:
-                lines = file.readlines()
-                # Remove header row (first line)
-                if lines:
-                    lines = lines[1:]
-                # Remove empty lines and strip whitespace
-                raw_lines = [line.strip() for line in lines if line.strip()]
-                return raw_lines
-        except UnicodeDecodeError:
-            # Try next encoding
-            continue
-        except FileNotFoundError:
-            print(f"Error: File '{filename}' not found.")
-            return []
-        except Exception as e:
-            # If all encodings fail, try the last one and return empty list
-            if encoding == encodings[-1]:
-                print(f"Error reading file: {e}")
+    try:
+        with open(filename, 'rb') as file:
+            # mmap cannot map an empty file
+            if os.fstat(file.fileno()).st_size == 0:
                 return []
-            continue
+            
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = None
+                for encoding in encodings:
+                    try:
+                        text = str(mapped, encoding)
+                        break
+                    except UnicodeDecodeError:
+                        # Try next encoding
+                        continue
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return []
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return []
+    
+    if text is None:
+        print(f"Error reading file: unable to decode '{filename}'")
+        return []
+    
+    # Normalise line endings the way text mode would, then split in one pass
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
     
-    return []
+    # Remove header row (first line), empty lines and surrounding whitespace
+    # (each line is stripped once; filter(None, ...) drops the empty results)
+    return list(filter(None, map(str.strip, islice(lines, 1, None))))
 
 
 def read_file(file_path: str, encoding: str = 'utf-8') -> Optional[List[str]]: